@@ -7,7 +7,7 @@ import os
 import json
 import logging
 import re
-from typing import Dict, List, Optional, Any, Tuple, Union
+from typing import Dict, List, Optional, Any, Tuple, Union, Callable
 from dataclasses import dataclass
 from enum import Enum
 import networkx as nx
@@ -45,6 +45,30 @@ class RuleOperator(Enum):
     IN_RANGE = "in_range"
     NOT_IN_RANGE = "not_in_range"
 
+def _in_range(field_value: Any, expected_value: Any) -> bool:
+    if isinstance(expected_value, list) and len(expected_value) == 2:
+        return float(expected_value[0]) <= float(field_value) <= float(expected_value[1])
+    return False
+
+def _not_in_range(field_value: Any, expected_value: Any) -> bool:
+    if isinstance(expected_value, list) and len(expected_value) == 2:
+        return not (float(expected_value[0]) <= float(field_value) <= float(expected_value[1]))
+    return True
+
+# Operator dispatch table (resolved once per condition at compile time)
+_OPERATOR_FUNCTIONS: Dict[RuleOperator, Callable[[Any, Any], bool]] = {
+    RuleOperator.EQUALS: lambda field_value, expected_value: field_value == expected_value,
+    RuleOperator.NOT_EQUALS: lambda field_value, expected_value: field_value != expected_value,
+    RuleOperator.GREATER_THAN: lambda field_value, expected_value: float(field_value) > float(expected_value),
+    RuleOperator.LESS_THAN: lambda field_value, expected_value: float(field_value) < float(expected_value),
+    RuleOperator.GREATER_EQUAL: lambda field_value, expected_value: float(field_value) >= float(expected_value),
+    RuleOperator.LESS_EQUAL: lambda field_value, expected_value: float(field_value) <= float(expected_value),
+    RuleOperator.CONTAINS: lambda field_value, expected_value: expected_value in str(field_value).lower(),
+    RuleOperator.NOT_CONTAINS: lambda field_value, expected_value: expected_value not in str(field_value).lower(),
+    RuleOperator.IN_RANGE: _in_range,
+    RuleOperator.NOT_IN_RANGE: _not_in_range,
+}
+
 @dataclass
 class RuleCondition:
     """Represents a condition in a rule."""
@@ -102,6 +126,9 @@ class AdvancedRuleEngine:
         self.rules: Dict[str, ComplianceRule] = {}
         self.rule_graph = nx.DiGraph()
         
+        # Compiled condition closures per rule (built once in add_rule)
+        self._compiled_conditions: Dict[str, List[Callable[[Dict[str, Any]], Dict[str, Any]]]] = {}
+        
         # Evaluation context
         self.evaluation_context = {}
         
@@ -490,6 +517,9 @@ class AdvancedRuleEngine:
     def add_rule(self, rule: ComplianceRule):
         """Add a rule to the engine."""
         self.rules[rule.rule_id] = rule
+        self._compiled_conditions[rule.rule_id] = [
+            self._compile_condition(condition) for condition in rule.conditions
+        ]
         
         # Add to rule graph
         self.rule_graph.add_node(rule.rule_id, **rule.__dict__)
@@ -579,9 +609,14 @@ class AdvancedRuleEngine:
             suggestions = []
             confidence = 1.0
             
+            compiled_conditions = self._compiled_conditions.get(rule.rule_id)
+            if compiled_conditions is None:
+                compiled_conditions = [self._compile_condition(c) for c in rule.conditions]
+                self._compiled_conditions[rule.rule_id] = compiled_conditions
+            
             # Evaluate each condition
-            for condition in rule.conditions:
-                condition_result = self._evaluate_condition(condition)
+            for evaluate_condition in compiled_conditions:
+                condition_result = evaluate_condition(self.evaluation_context)
                 
                 if not condition_result['passed']:
                     violations.append(condition_result['message'])
@@ -615,34 +650,71 @@ class AdvancedRuleEngine:
                 context={}
             )
     
-    def _evaluate_condition(self, condition: RuleCondition) -> Dict[str, Any]:
-        """Evaluate a single condition."""
-        try:
-            field_value = self._get_field_value(condition.field)
-            
-            if field_value is None:
+    def _compile_condition(self, condition: RuleCondition) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """
+        Compile a condition into a closure over a context dict.
+        
+        Field path, operator function and messages are resolved once here, so
+        evaluation is a direct function call instead of re-interpreting the
+        condition on every run.
+        """
+        field = condition.field
+        field_parts = tuple(field.split('.')) if '.' in field else None
+        operator = condition.operator
+        operator_function = _OPERATOR_FUNCTIONS.get(operator)
+        expected_value = condition.value
+        confidence = condition.confidence
+        not_found_message = f"Field '{field}' not found in project data"
+        failed_message = f"Condition {field} {operator.value} {expected_value} failed"
+        
+        def evaluate(context: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                if field_parts is None:
+                    field_value = context.get(field)
+                else:
+                    field_value = context
+                    for part in field_parts:
+                        if isinstance(field_value, dict) and part in field_value:
+                            field_value = field_value[part]
+                        else:
+                            field_value = None
+                            break
+                
+                if field_value is None:
+                    return {
+                        'passed': False,
+                        'message': not_found_message,
+                        'confidence': 0.0
+                    }
+                
+                if operator_function is None:
+                    result = False
+                else:
+                    try:
+                        result = operator_function(field_value, expected_value)
+                    except (ValueError, TypeError) as e:
+                        logger.warning(f"Error applying operator {operator} to {field_value}: {e}")
+                        result = False
+                
+                return {
+                    'passed': result,
+                    'message': failed_message if not result else "",
+                    'confidence': confidence
+                }
+                
+            except Exception as e:
+                logger.error(f"Error evaluating condition: {e}")
                 return {
                     'passed': False,
-                    'message': f"Field '{condition.field}' not found in project data",
+                    'message': f"Error evaluating condition: {str(e)}",
                     'confidence': 0.0
                 }
-            
-            # Apply operator
-            result = self._apply_operator(field_value, condition.operator, condition.value)
-            
-            return {
-                'passed': result,
-                'message': f"Condition {condition.field} {condition.operator.value} {condition.value} failed" if not result else "",
-                'confidence': condition.confidence
-            }
-            
-        except Exception as e:
-            logger.error(f"Error evaluating condition: {e}")
-            return {
-                'passed': False,
-                'message': f"Error evaluating condition: {str(e)}",
-                'confidence': 0.0
-            }
+        
+        return evaluate
+    
+    def _evaluate_condition(self, condition: RuleCondition) -> Dict[str, Any]:
+        """Evaluate a single condition."""
+        return self._compile_condition(condition)(self.evaluation_context)
     
     def _get_field_value(self, field: str) -> Any:
         """Get field value from evaluation context."""
@@ -662,34 +734,12 @@ class AdvancedRuleEngine:
     
     def _apply_operator(self, field_value: Any, operator: RuleOperator, expected_value: Any) -> bool:
         """Apply operator to field value and expected value."""
+        operator_function = _OPERATOR_FUNCTIONS.get(operator)
+        if operator_function is None:
+            return False
+        
         try:
-            if operator == RuleOperator.EQUALS:
-                return field_value == expected_value
-            elif operator == RuleOperator.NOT_EQUALS:
-                return field_value != expected_value
-            elif operator == RuleOperator.GREATER_THAN:
-                return float(field_value) > float(expected_value)
-            elif operator == RuleOperator.LESS_THAN:
-                return float(field_value) < float(expected_value)
-            elif operator == RuleOperator.GREATER_EQUAL:
-                return float(field_value) >= float(expected_value)
-            elif operator == RuleOperator.LESS_EQUAL:
-                return float(field_value) <= float(expected_value)
-            elif operator == RuleOperator.CONTAINS:
-                return expected_value in str(field_value).lower()
-            elif operator == RuleOperator.NOT_CONTAINS:
-                return expected_value not in str(field_value).lower()
-            elif operator == RuleOperator.IN_RANGE:
-                if isinstance(expected_value, list) and len(expected_value) == 2:
-                    return float(expected_value[0]) <= float(field_value) <= float(expected_value[1])
-                return False
-            elif operator == RuleOperator.NOT_IN_RANGE:
-                if isinstance(expected_value, list) and len(expected_value) == 2:
-                    return not (float(expected_value[0]) <= float(field_value) <= float(expected_value[1]))
-                return True
-            else:
-                return False
-                
+            return operator_function(field_value, expected_value)
         except (ValueError, TypeError) as e:
             logger.warning(f"Error applying operator {operator} to {field_value}: {e}")
             return False
@@ -20,6 +20,7 @@ except ImportError:
             pass
 
 from .config import get_config
+from .enhanced_prompts import LazyPrompt
 from .error_handling import AIProcessingError, ErrorCode, handle_exception
 from .logging_config import log_performance, log_api_call
 
@@ -184,6 +185,13 @@ class AIClient:
                 error=f"Rate limit exceeded. Wait {wait_time:.1f} seconds"
             )
         
+        # Render any lazy prompts only now that the request will actually be sent
+        messages = [
+            {**message, 'content': str(message['content'])}
+            if isinstance(message.get('content'), LazyPrompt) else message
+            for message in messages
+        ]
+        
         # Record request
         self.rate_limiter.record_request()
         self.stats['total_requests'] += 1
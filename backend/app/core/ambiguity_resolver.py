@@ -9,7 +9,7 @@ import re
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-from enum import Enum
+from enum import Enum, IntEnum
 import difflib
 
 from .config import get_config
@@ -28,6 +28,20 @@ class AmbiguityType(Enum):
     REGULATORY_CONFLICT = "regulatory_conflict"
     TECHNICAL_UNCERTAINTY = "technical_uncertainty"
 
+class Severity(IntEnum):
+    """Severidad de una ambigüedad como entero ordenable"""
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+    CRITICAL = 3
+    
+    @classmethod
+    def from_label(cls, label: str) -> 'Severity':
+        """Convierte la etiqueta textual ('HIGH', 'MEDIUM', ...) en Severity"""
+        return _SEVERITY_BY_LABEL.get(label, cls.LOW)
+
+_SEVERITY_BY_LABEL = {severity.name: severity for severity in Severity}
+
 class ResolutionStrategy(Enum):
     """Estrategias de resolución"""
     ASK_CLARIFICATION = "ask_clarification"
@@ -6,14 +6,22 @@ Fase 3: Sistema de Preguntas Inteligentes
 import logging
 import os
 import json
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass
+import time
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Any, Tuple, Callable
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from types import MappingProxyType
+from functools import lru_cache, wraps
 import asyncio
+from bisect import bisect_right
+import numpy as np
 
 from .config import get_config
 from .logging_config import get_logger
-from .error_handling import handle_exception
 from .file_manager import FileManager
 from .enhanced_ocr_processor import EnhancedOCRProcessor
 from .computer_vision_analyzer import ComputerVisionAnalyzer
@@ -25,11 +33,188 @@ from .production_checker_logic import ProductionComplianceChecker
 from .neo4j_manager import Neo4jManager
 from .intelligent_question_engine import IntelligentQuestionEngine, QuestionContext
 from .conversational_ai import ConversationalAI
-from .ambiguity_resolver import AmbiguityResolver
+from .ambiguity_resolver import AmbiguityResolver, Severity
 from .report_generator import ReportGenerator, ReportType
 
 logger = get_logger(__name__)
 
+# Ponderaciones de la puntuación general (constantes de módulo, no se reconstruyen por llamada)
+SCORE_WEIGHTS = MappingProxyType({
+    'document_confidence': 0.15,
+    'plan_compliance': 0.25,
+    'dimension_compliance': 0.20,
+    'compliance_overall': 0.25,
+    'nlp_analysis': 0.10,
+    'rule_analysis': 0.05
+})
+_SCORE_WEIGHTS = np.fromiter(SCORE_WEIGHTS.values(), dtype=np.float64, count=len(SCORE_WEIGHTS))
+
+# Extensiones de PDF aceptadas (str.endswith con tupla, sin crear una copia en minúsculas del nombre)
+_PDF_SUFFIXES = ('.pdf', '.PDF', '.Pdf')
+
+# Reglas de cumplimiento: (campo de ComplianceAnalysis, umbral mínimo, mensaje)
+_CRITICAL_COMPLIANCE_RULES = (
+    ('overall_compliance', 0.6, "Cumplimiento normativo insuficiente"),
+    ('accessibility_compliance', 0.5, "Problemas críticos de accesibilidad"),
+    ('fire_safety_compliance', 0.5, "Problemas críticos de seguridad contra incendios"),
+)
+_RECOMMENDATION_COMPLIANCE_RULES = (
+    ('accessibility_compliance', 0.7, "Mejorar accesibilidad universal del proyecto"),
+    ('fire_safety_compliance', 0.7, "Reforzar medidas de seguridad contra incendios"),
+)
+
+# Recomendación por tramo de puntuación general (bisect sobre los límites de cada tramo)
+_SCORE_BAND_LIMITS = (5.0, 7.0, 9.0)
+_SCORE_BAND_RECOMMENDATIONS = (
+    "Revisión completa del proyecto requerida",
+    "Mejoras significativas recomendadas",
+    "Proyecto en buen estado, optimizaciones menores",
+    "Proyecto en excelente estado",
+)
+
+# Con cumplimiento global >= 0.9 ninguna de las cuatro áreas puede quedar por debajo de 0.6,
+# por lo que ninguna regla de _CRITICAL_COMPLIANCE_RULES puede dispararse
+_CRITICAL_COMPLIANCE_SAFE_LEVEL = 0.9
+
+@dataclass(slots=True)
+class DocumentOCRResult:
+    """Resultado OCR de un documento de memoria"""
+    extracted_text: str = ''
+    confidence: float = 0.0
+    pages: int = 0
+    processing_time: float = 0.0
+
+@dataclass(slots=True)
+class NLPResult:
+    """Resultado del análisis NLP de un documento"""
+    extracted_data: Dict[str, Any] = field(default_factory=dict)
+    confidence: float = 0.0
+
+@dataclass(slots=True)
+class PlanResult:
+    """Resultado del análisis de un plano"""
+    elements: List[Dict[str, Any]] = field(default_factory=list)
+    rooms: List[Dict[str, Any]] = field(default_factory=list)
+    accessibility_issues: List[str] = field(default_factory=list)
+    fire_safety_issues: List[str] = field(default_factory=list)
+    structural_issues: List[str] = field(default_factory=list)
+    compliance_score: float = 0.0
+
+@dataclass(slots=True)
+class DocumentAnalysis:
+    """Resultado del análisis avanzado de documentos (Fase 1)"""
+    confidence_score: float = 0.0
+    # Fichero temporal del servidor: no se expone en la vista dict (API / resultado persistido)
+    extracted_text_path: str = field(default='', metadata={'internal': True})
+    extracted_text_preview: str = ''
+    extracted_data: Dict[str, Any] = field(default_factory=dict)
+    contradictions: List[Any] = field(default_factory=list)
+    entities: List[Any] = field(default_factory=list)
+    sentiment: Any = None
+    nlp_confidence: float = 0.0
+    processing_time: float = 0.0
+
+@dataclass(slots=True)
+class PlanAnalysisSummary:
+    """Resultado agregado del análisis de planos (Fase 2)"""
+    elements: List[Dict[str, Any]] = field(default_factory=list)
+    rooms: List[Dict[str, Any]] = field(default_factory=list)
+    accessibility_issues: List[str] = field(default_factory=list)
+    fire_safety_issues: List[str] = field(default_factory=list)
+    structural_issues: List[str] = field(default_factory=list)
+    overall_compliance: float = 0.0
+    plans_processed: int = 0
+    total_elements: int = 0
+
+@dataclass(slots=True)
+class DimensionAnalysis:
+    """Resultado del análisis de dimensiones"""
+    total_area: float = 0.0
+    room_areas: Dict[str, float] = field(default_factory=dict)
+    wall_lengths: List[float] = field(default_factory=list)
+    door_widths: List[float] = field(default_factory=list)
+    total_dimensions: int = 0
+    rooms_count: int = 0
+    compliance_score: float = 0.0
+
+@dataclass(slots=True)
+class ComplianceAnalysis:
+    """Resultado de la verificación de cumplimiento normativo"""
+    dimension_compliance: float = 0.0
+    accessibility_compliance: float = 0.0
+    fire_safety_compliance: float = 0.0
+    structural_compliance: float = 0.0
+    overall_compliance: float = 0.0
+    project_type: str = ''
+
+@dataclass(slots=True)
+class NLPAnalysis:
+    """Resultado del análisis NLP avanzado"""
+    coherence_score: float = 0.0
+    complexity_score: float = 0.0
+    readability_score: float = 0.0
+    analysis_confidence: float = 0.0
+
+@dataclass(slots=True)
+class RuleAnalysis:
+    """Resultado del análisis con motor de reglas"""
+    rules_evaluated: int = 0
+    rules_passed: int = 0
+    rules_failed: int = 0
+    compliance_score: float = 0.0
+    violations: List[Any] = field(default_factory=list)
+
+@dataclass(slots=True)
+class AmbiguityTable:
+    """Ambigüedades resueltas en formato columnar (listas paralelas)"""
+    ambiguity_ids: List[str] = field(default_factory=list)
+    severities: List[Severity] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+    
+    def append(self, ambiguity_id: str, severity: str, description: str):
+        """Añade una ambigüedad a la tabla"""
+        self.ambiguity_ids.append(ambiguity_id)
+        self.severities.append(Severity.from_label(severity))
+        self.descriptions.append(description)
+    
+    def __len__(self) -> int:
+        return len(self.ambiguity_ids)
+
+_CONVERSATION_ERROR_MESSAGE = "Lo siento, ha ocurrido un error. Por favor, intenta de nuevo."
+
+def _safe_default(message: str, default_factory: Callable[[], Any] = lambda: None):
+    """Decorador de métodos: registra la excepción en self.logger y devuelve un valor por defecto"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            except Exception as e:
+                self.logger.error("%s: %s", message, e)
+                return default_factory()
+        return wrapper
+    return decorator
+
+@lru_cache(maxsize=1024)
+def _issue_penalty_score(issue_count: int, penalty_per_issue: float) -> float:
+    """Puntuación de cumplimiento (base 1.0) penalizada por número de problemas"""
+    return max(0.0, 1.0 - issue_count * penalty_per_issue)
+
+@lru_cache(maxsize=128)
+def _weighted_overall_score(score_key: Tuple[float, ...]) -> float:
+    """Puntuación general (0-10) para las seis puntuaciones parciales, en el orden de SCORE_WEIGHTS"""
+    scores = np.array(score_key, dtype=np.float64) * 10.0
+    return float(np.clip(scores @ _SCORE_WEIGHTS, 0.0, 10.0))
+
+def _result_from_dict(result_type, data: Optional[Dict[str, Any]]):
+    """Construye un resultado tipado a partir del dict devuelto por un procesador"""
+    names = {f.name for f in fields(result_type)}
+    return result_type(**{k: v for k, v in (data or {}).items() if k in names and v is not None})
+
+def _result_to_dict(result) -> Dict[str, Any]:
+    """Convierte un resultado tipado en dict (copia superficial) para otros componentes"""
+    return {f.name: getattr(result, f.name) for f in fields(result) if not f.metadata.get('internal')}
+
 @dataclass
 class ComprehensiveAnalysisResult:
     """Resultado del análisis integral completo"""
@@ -82,6 +267,10 @@ class EnhancedProjectAnalyzerV4:
         # Verificador de cumplimiento
         self.compliance_checker = ProductionComplianceChecker()
         
+        # Conteo de nodos/relaciones escritos en Neo4j por proyecto
+        self._graph_counts: Dict[str, Dict[str, Counter]] = {}
+        self._graph_counts_lock = threading.Lock()
+        
         # Inicializar componentes
         self._initialize_components()
     
@@ -102,72 +291,85 @@ class EnhancedProjectAnalyzerV4:
             self.logger.info("Enhanced Project Analyzer V4 inicializado correctamente")
             
         except Exception as e:
-            self.logger.error(f"Error inicializando componentes: {e}")
+            self.logger.error("Error inicializando componentes: %s", e)
             raise
     
-    @handle_exception
-    def analyze_project_comprehensive(self, memory_file: str, plans_directory: str, 
-                                    project_type: str = "residential") -> ComprehensiveAnalysisResult:
+    async def analyze_project_comprehensive(self, memory_file: str, plans_directory: str, 
+                                          project_type: str = "residential") -> ComprehensiveAnalysisResult:
         """Realiza análisis integral completo del proyecto"""
+        document_analysis = None
+        project_id = None
         try:
-            start_time = datetime.now()
-            self.logger.info(f"Iniciando análisis integral para proyecto tipo: {project_type}")
+            start_time = time.perf_counter()
+            self.logger.info("Iniciando análisis integral para proyecto tipo: %s", project_type)
             
             # Crear ID único del proyecto
-            project_id = f"project_{int(datetime.now().timestamp())}"
+            project_id = f"project_{int(time.time())}"
             
-            # 1. FASE 1: Procesamiento Avanzado de Documentos
+            # 1-3. Fases independientes entre sí: se ejecutan en hilos para no bloquear el event loop
             self.logger.info("=== FASE 1: Procesamiento Avanzado de Documentos ===")
-            document_analysis = self._analyze_documents_advanced(memory_file, project_id)
-            
-            # 2. FASE 2: Visión por Computador para Planos
             self.logger.info("=== FASE 2: Visión por Computador para Planos ===")
-            plan_analysis = self._analyze_plans_computer_vision(plans_directory, project_id)
-            
-            # 3. Análisis de Dimensiones
             self.logger.info("=== Análisis de Dimensiones ===")
-            dimension_analysis = self._analyze_dimensions(plans_directory, project_id)
+            document_analysis, plan_analysis, dimension_analysis = await asyncio.gather(
+                asyncio.to_thread(self._analyze_documents_advanced, memory_file, project_id),
+                asyncio.to_thread(self._analyze_plans_computer_vision, plans_directory, project_id),
+                asyncio.to_thread(self._analyze_dimensions, plans_directory, project_id)
+            )
+            
+            # Vista dict para los componentes externos (ambigüedades, preguntas, reporte, API)
+            document_analysis_dict = _result_to_dict(document_analysis)
+            plan_analysis_dict = _result_to_dict(plan_analysis)
+            dimension_analysis_dict = _result_to_dict(dimension_analysis)
             
             # 4. Verificación de Cumplimiento
             self.logger.info("=== Verificación de Cumplimiento ===")
             compliance_analysis = self._analyze_compliance(
                 document_analysis, plan_analysis, dimension_analysis, project_type
             )
+            compliance_analysis_dict = _result_to_dict(compliance_analysis)
             
             # 5. FASE 3: Sistema de Preguntas Inteligentes
             self.logger.info("=== FASE 3: Sistema de Preguntas Inteligentes ===")
             
             # Detectar ambigüedades
-            ambiguities = self._detect_and_resolve_ambiguities(
-                project_id, document_analysis, plan_analysis, dimension_analysis
+            ambiguities, ambiguity_table = await asyncio.to_thread(
+                self._detect_and_resolve_ambiguities,
+                project_id, document_analysis_dict, plan_analysis_dict, dimension_analysis_dict
             )
             
             # Generar preguntas inteligentes
-            questions = self._generate_intelligent_questions(
-                project_id, document_analysis, plan_analysis, dimension_analysis, ambiguities
+            questions = await asyncio.to_thread(
+                self._generate_intelligent_questions,
+                project_id, document_analysis_dict, plan_analysis_dict, dimension_analysis_dict, ambiguities
             )
             
             # Crear grafo de conocimiento
-            knowledge_graph = self._build_knowledge_graph(
-                project_id, document_analysis, plan_analysis, dimension_analysis, 
-                compliance_analysis, ambiguities, questions
+            knowledge_graph = await asyncio.to_thread(
+                self._build_knowledge_graph,
+                project_id, document_analysis_dict, plan_analysis_dict, dimension_analysis_dict, 
+                compliance_analysis_dict, ambiguities, questions
             )
             
             # 6. Análisis NLP Avanzado
             self.logger.info("=== Análisis NLP Avanzado ===")
-            nlp_analysis = self._perform_advanced_nlp_analysis(document_analysis, project_id)
+            nlp_analysis = await asyncio.to_thread(
+                self._perform_advanced_nlp_analysis, document_analysis, project_id
+            )
             
             # 7. Análisis con Motor de Reglas
             self.logger.info("=== Análisis con Motor de Reglas ===")
-            rule_analysis = self._perform_rule_analysis(
-                document_analysis, plan_analysis, dimension_analysis, compliance_analysis
+            rule_analysis = await asyncio.to_thread(
+                self._perform_rule_analysis,
+                document_analysis, plan_analysis_dict, dimension_analysis_dict, compliance_analysis_dict
             )
             
             # 8. Generar reporte integral
             self.logger.info("=== Generación de Reporte Integral ===")
-            report_path = self._generate_comprehensive_report(
-                project_id, document_analysis, plan_analysis, dimension_analysis,
-                compliance_analysis, nlp_analysis, rule_analysis, ambiguities, questions
+            report_path = await asyncio.to_thread(
+                self._generate_comprehensive_report,
+                project_id, document_analysis_dict, plan_analysis_dict, dimension_analysis_dict,
+                compliance_analysis_dict, _result_to_dict(nlp_analysis), _result_to_dict(rule_analysis),
+                ambiguities, questions
             )
             
             # 9. Calcular puntuación general
@@ -178,15 +380,15 @@ class EnhancedProjectAnalyzerV4:
             
             # 10. Identificar problemas críticos y recomendaciones
             critical_issues = self._identify_critical_issues(
-                compliance_analysis, ambiguities, plan_analysis
+                compliance_analysis, ambiguity_table, plan_analysis
             )
             
             recommendations = self._generate_recommendations(
-                overall_score, critical_issues, compliance_analysis, ambiguities
+                overall_score, critical_issues, compliance_analysis, ambiguity_table
             )
             
             # Calcular tiempo de procesamiento
-            processing_time = (datetime.now() - start_time).total_seconds()
+            processing_time = time.perf_counter() - start_time
             
             # Contar archivos procesados
             files_processed = self._count_processed_files(memory_file, plans_directory)
@@ -195,12 +397,12 @@ class EnhancedProjectAnalyzerV4:
             result = ComprehensiveAnalysisResult(
                 project_id=project_id,
                 overall_score=overall_score,
-                document_analysis=document_analysis,
-                plan_analysis=plan_analysis,
-                dimension_analysis=dimension_analysis,
-                compliance_analysis=compliance_analysis,
-                nlp_analysis=nlp_analysis,
-                rule_analysis=rule_analysis,
+                document_analysis=document_analysis_dict,
+                plan_analysis=plan_analysis_dict,
+                dimension_analysis=dimension_analysis_dict,
+                compliance_analysis=compliance_analysis_dict,
+                nlp_analysis=_result_to_dict(nlp_analysis),
+                rule_analysis=_result_to_dict(rule_analysis),
                 ambiguities=ambiguities,
                 questions=questions,
                 knowledge_graph=knowledge_graph,
@@ -218,122 +420,144 @@ class EnhancedProjectAnalyzerV4:
                 }
             )
             
-            self.logger.info(f"Análisis integral completado en {processing_time:.2f} segundos")
-            self.logger.info(f"Puntuación general: {overall_score:.2f}/10")
-            self.logger.info(f"Archivos procesados: {files_processed}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("Análisis integral completado en %.2f segundos", processing_time)
+                self.logger.info("Puntuación general: %.2f/10", overall_score)
+                self.logger.info("Archivos procesados: %s", files_processed)
             
             return result
             
         except Exception as e:
-            self.logger.error(f"Error en análisis integral: {e}")
+            self.logger.error("Error en análisis integral: %s", e)
             raise
+        finally:
+            if document_analysis is not None:
+                self._remove_extracted_text(document_analysis)
+            # Los conteos del grafo solo se consumen en _build_knowledge_graph; no dejar restos si falla antes
+            with self._graph_counts_lock:
+                self._graph_counts.pop(project_id, None)
     
-    def _analyze_documents_advanced(self, memory_file: str, project_id: str) -> Dict[str, Any]:
+    @_safe_default("Error en análisis avanzado de documentos", DocumentAnalysis)
+    def _analyze_documents_advanced(self, memory_file: str, project_id: str) -> DocumentAnalysis:
         """Análisis avanzado de documentos (Fase 1)"""
-        try:
-            self.logger.info("Procesando documentos con OCR avanzado...")
-            
-            # Procesar documento con OCR
-            ocr_result = self.ocr_processor.process_document(memory_file)
-            
-            # Análisis NLP avanzado
-            nlp_result = self.nlp_processor.analyze_text_advanced(ocr_result.get('extracted_text', ''))
-            
-            # Detectar contradicciones
-            contradictions = self.nlp_processor.detect_contradictions(nlp_result)
-            
-            # Extraer entidades
-            entities = self.nlp_processor.extract_entities(ocr_result.get('extracted_text', ''))
-            
-            # Análisis de sentimientos
-            sentiment = self.nlp_processor.analyze_sentiment(ocr_result.get('extracted_text', ''))
-            
-            # Crear nodo de documento en Neo4j
-            document_data = {
-                'id': f"doc_{project_id}",
-                'name': os.path.basename(memory_file),
-                'type': 'memory',
-                'file_path': memory_file,
-                'pages': ocr_result.get('pages', 0),
-                'size': os.path.getsize(memory_file) if os.path.exists(memory_file) else 0,
-                'extracted_text': ocr_result.get('extracted_text', '')
-            }
-            
-            self.neo4j_manager.create_document_node(document_data, project_id)
-            
-            return {
-                'confidence_score': ocr_result.get('confidence', 0.0),
-                'extracted_text': ocr_result.get('extracted_text', ''),
-                'extracted_data': nlp_result.get('extracted_data', {}),
-                'contradictions': contradictions,
-                'entities': entities,
-                'sentiment': sentiment,
-                'nlp_confidence': nlp_result.get('confidence', 0.0),
-                'processing_time': ocr_result.get('processing_time', 0.0)
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis avanzado de documentos: {e}")
-            return {}
+        self.logger.info("Procesando documentos con OCR avanzado...")
+        
+        # Procesar documento con OCR
+        ocr_result = _result_from_dict(
+            DocumentOCRResult, self.ocr_processor.process_document(memory_file)
+        )
+        
+        # Texto extraído (se reutiliza en todo el análisis)
+        text = ocr_result.extracted_text
+        
+        # Análisis NLP avanzado
+        nlp_raw = self.nlp_processor.analyze_text_advanced(text)
+        nlp_result = _result_from_dict(NLPResult, nlp_raw)
+        
+        # Detectar contradicciones
+        contradictions = self.nlp_processor.detect_contradictions(nlp_raw)
+        
+        # Extraer entidades
+        entities = self.nlp_processor.extract_entities(text)
+        
+        # Análisis de sentimientos
+        sentiment = self.nlp_processor.analyze_sentiment(text)
+        
+        # Conservar solo un extracto en memoria (el texto completo se vuelca a disco al final)
+        text_preview = text[:2048]
+        
+        # Crear nodo de documento en Neo4j
+        document_data = {
+            'id': f"doc_{project_id}",
+            'name': os.path.basename(memory_file),
+            'type': 'memory',
+            'file_path': memory_file,
+            'pages': ocr_result.pages,
+            'size': os.path.getsize(memory_file) if os.path.exists(memory_file) else 0,
+            'extracted_text': text_preview
+        }
+        
+        document_node_id = self.neo4j_manager.create_document_node(document_data, None)
+        if document_node_id:
+            self._record_graph_write(project_id, document_data['type'])
+            self._link_graph_nodes(project_id, project_id, document_node_id, "project_document")
+        
+        # Fichero único por análisis; analyze_project_comprehensive lo borra al terminar
+        fd, text_path = tempfile.mkstemp(prefix=f"ocr_{project_id}_", suffix='.txt',
+                                         dir=self.file_manager.temp_dir)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        
+        return DocumentAnalysis(
+            confidence_score=ocr_result.confidence,
+            extracted_text_path=text_path,
+            extracted_text_preview=text_preview,
+            extracted_data=nlp_result.extracted_data,
+            contradictions=contradictions,
+            entities=entities,
+            sentiment=sentiment,
+            nlp_confidence=nlp_result.confidence,
+            processing_time=ocr_result.processing_time
+        )
     
-    def _analyze_plans_computer_vision(self, plans_directory: str, project_id: str) -> Dict[str, Any]:
+    @_safe_default("Error en análisis de planos", PlanAnalysisSummary)
+    def _analyze_plans_computer_vision(self, plans_directory: str, project_id: str) -> PlanAnalysisSummary:
         """Análisis de planos con visión por computador (Fase 2)"""
-        try:
-            self.logger.info("Analizando planos con visión por computador...")
-            
-            if not os.path.exists(plans_directory):
-                self.logger.warning(f"Directorio de planos no encontrado: {plans_directory}")
-                return {}
-            
-            # Obtener archivos de planos
-            plan_files = [f for f in os.listdir(plans_directory) if f.lower().endswith('.pdf')]
-            
-            if not plan_files:
-                self.logger.warning("No se encontraron archivos PDF en el directorio de planos")
-                return {}
-            
-            all_elements = []
-            all_rooms = []
-            accessibility_issues = []
-            fire_safety_issues = []
-            structural_issues = []
-            
+        self.logger.info("Analizando planos con visión por computador...")
+        
+        if not os.path.exists(plans_directory):
+            self.logger.warning("Directorio de planos no encontrado: %s", plans_directory)
+            return PlanAnalysisSummary()
+        
+        # Obtener archivos de planos
+        plan_files = [f for f in os.listdir(plans_directory) if f.endswith(_PDF_SUFFIXES)]
+        
+        if not plan_files:
+            self.logger.warning("No se encontraron archivos PDF en el directorio de planos")
+            return PlanAnalysisSummary()
+        
+        all_elements = []
+        all_rooms = []
+        accessibility_issues = []
+        fire_safety_issues = []
+        structural_issues = []
+        
+        # Escrituras en Neo4j por plano, solapadas con el análisis del siguiente
+        write_jobs = {}
+        with ThreadPoolExecutor(max_workers=8) as executor:
             for plan_file in plan_files:
                 plan_path = os.path.join(plans_directory, plan_file)
                 
                 try:
                     # Análisis con visión por computador
-                    cv_result = self.cv_analyzer.analyze_plan(plan_path)
+                    cv_result = _result_from_dict(PlanResult, self.cv_analyzer.analyze_plan(plan_path))
                     
                     # Análisis específico de planos
-                    plan_result = self.plan_analyzer.analyze_plan(plan_path)
+                    plan_result = _result_from_dict(PlanResult, self.plan_analyzer.analyze_plan(plan_path))
                     
                     # Combinar resultados
-                    elements = cv_result.get('elements', []) + plan_result.get('elements', [])
+                    elements = cv_result.elements + plan_result.elements
                     all_elements.extend(elements)
                     
-                    rooms = plan_result.get('rooms', [])
-                    all_rooms.extend(rooms)
+                    all_rooms.extend(plan_result.rooms)
                     
                     # Recopilar problemas
-                    accessibility_issues.extend(plan_result.get('accessibility_issues', []))
-                    fire_safety_issues.extend(plan_result.get('fire_safety_issues', []))
-                    structural_issues.extend(plan_result.get('structural_issues', []))
+                    accessibility_issues.extend(plan_result.accessibility_issues)
+                    fire_safety_issues.extend(plan_result.fire_safety_issues)
+                    structural_issues.extend(plan_result.structural_issues)
                     
-                    # Crear nodo de plano en Neo4j
+                    # Datos del nodo de plano
                     plan_data = {
                         'id': f"plan_{os.path.splitext(plan_file)[0]}",
                         'name': plan_file,
                         'type': 'architectural_plan',
                         'elements_count': len(elements),
-                        'compliance_score': plan_result.get('compliance_score', 0.0)
+                        'compliance_score': plan_result.compliance_score
                     }
                     
-                    self.neo4j_manager.create_plan_node(plan_data, project_id)
-                    
-                    # Crear nodos de elementos
-                    for element in elements:
-                        element_data = {
+                    # Datos de los nodos de elementos
+                    elements_data = [
+                        {
                             'id': element.get('id', f"elem_{len(all_elements)}"),
                             'type': element.get('type', 'unknown'),
                             'name': element.get('name', ''),
@@ -342,596 +566,529 @@ class EnhancedProjectAnalyzerV4:
                             'properties': element.get('properties', {}),
                             'confidence': element.get('confidence', 0.0)
                         }
-                        
-                        self.neo4j_manager.create_element_node(element_data, plan_data['id'])
+                        for element in elements
+                    ]
+                    
+                    future = executor.submit(
+                        self._write_plan_and_elements, plan_data, elements_data, project_id
+                    )
+                    write_jobs[future] = plan_file
                     
                 except Exception as e:
-                    self.logger.error(f"Error procesando plano {plan_file}: {e}")
+                    self.logger.error("Error procesando plano %s: %s", plan_file, e)
                     continue
             
-            # Calcular puntuación de cumplimiento general
-            overall_compliance = self._calculate_plan_compliance(
-                all_elements, accessibility_issues, fire_safety_issues, structural_issues
-            )
-            
-            return {
-                'elements': all_elements,
-                'rooms': all_rooms,
-                'accessibility_issues': accessibility_issues,
-                'fire_safety_issues': fire_safety_issues,
-                'structural_issues': structural_issues,
-                'overall_compliance': overall_compliance,
-                'plans_processed': len(plan_files),
-                'total_elements': len(all_elements)
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis de planos: {e}")
-            return {}
+            for future in as_completed(write_jobs):
+                try:
+                    future.result()
+                except Exception as e:
+                    self.logger.error("Error guardando plano %s en Neo4j: %s", write_jobs[future], e)
+        
+        # Calcular puntuación de cumplimiento general
+        overall_compliance = self._calculate_plan_compliance(
+            all_elements, accessibility_issues, fire_safety_issues, structural_issues
+        )
+        
+        return PlanAnalysisSummary(
+            elements=all_elements,
+            rooms=all_rooms,
+            accessibility_issues=accessibility_issues,
+            fire_safety_issues=fire_safety_issues,
+            structural_issues=structural_issues,
+            overall_compliance=overall_compliance,
+            plans_processed=len(plan_files),
+            total_elements=len(all_elements)
+        )
+    
+    def _write_plan_and_elements(self, plan_data: Dict[str, Any], elements_data: List[Dict[str, Any]],
+                                 project_id: str):
+        """Crea en Neo4j el nodo de un plano y los nodos de sus elementos"""
+        plan_node_id = self.neo4j_manager.create_plan_node(plan_data, None)
+        if plan_node_id:
+            self._record_graph_write(project_id, plan_data['type'])
+            self._link_graph_nodes(project_id, project_id, plan_node_id, "project_plan")
+        
+        for element_data in elements_data:
+            element_node_id = self.neo4j_manager.create_element_node(element_data, None)
+            if element_node_id:
+                self._record_graph_write(project_id, element_data['type'])
+                if plan_node_id:
+                    self._link_graph_nodes(project_id, plan_node_id, element_node_id, "plan_element")
     
-    def _analyze_dimensions(self, plans_directory: str, project_id: str) -> Dict[str, Any]:
+    @_safe_default("Error en análisis de dimensiones", DimensionAnalysis)
+    def _analyze_dimensions(self, plans_directory: str, project_id: str) -> DimensionAnalysis:
         """Análisis de dimensiones"""
-        try:
-            self.logger.info("Analizando dimensiones...")
-            
-            if not os.path.exists(plans_directory):
-                return {}
-            
-            plan_files = [f for f in os.listdir(plans_directory) if f.lower().endswith('.pdf')]
-            
-            all_dimensions = []
-            room_areas = {}
-            wall_lengths = []
-            door_widths = []
+        self.logger.info("Analizando dimensiones...")
+        
+        if not os.path.exists(plans_directory):
+            return DimensionAnalysis()
+        
+        plan_files = [f for f in os.listdir(plans_directory) if f.endswith(_PDF_SUFFIXES)]
+        
+        all_dimensions = []
+        room_areas = {}
+        wall_lengths = []
+        door_widths = []
+        
+        for plan_file in plan_files:
+            plan_path = os.path.join(plans_directory, plan_file)
             
-            for plan_file in plan_files:
-                plan_path = os.path.join(plans_directory, plan_file)
+            try:
+                # Extraer dimensiones
+                dimensions = self.dimension_extractor.extract_dimensions(plan_path)
+                all_dimensions.extend(dimensions)
                 
-                try:
-                    # Extraer dimensiones
-                    dimensions = self.dimension_extractor.extract_dimensions(plan_path)
-                    all_dimensions.extend(dimensions)
-                    
-                    # Procesar dimensiones específicas
-                    for dim in dimensions:
-                        if dim.get('type') == 'room_area':
-                            room_name = dim.get('room_name', 'unknown')
-                            area = dim.get('value', 0)
-                            room_areas[room_name] = area
-                        elif dim.get('type') == 'wall_length':
-                            wall_lengths.append(dim.get('value', 0))
-                        elif dim.get('type') == 'door_width':
-                            door_widths.append(dim.get('value', 0))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error extrayendo dimensiones de {plan_file}: {e}")
-                    continue
-            
-            # Calcular área total
-            total_area = sum(room_areas.values())
-            
-            return {
-                'total_area': total_area,
-                'room_areas': room_areas,
-                'wall_lengths': wall_lengths,
-                'door_widths': door_widths,
-                'total_dimensions': len(all_dimensions),
-                'rooms_count': len(room_areas)
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis de dimensiones: {e}")
-            return {}
+                # Procesar dimensiones específicas
+                for dim in dimensions:
+                    if dim.get('type') == 'room_area':
+                        room_name = dim.get('room_name', 'unknown')
+                        area = dim.get('value', 0)
+                        room_areas[room_name] = area
+                    elif dim.get('type') == 'wall_length':
+                        wall_lengths.append(dim.get('value', 0))
+                    elif dim.get('type') == 'door_width':
+                        door_widths.append(dim.get('value', 0))
+                
+            except Exception as e:
+                self.logger.error("Error extrayendo dimensiones de %s: %s", plan_file, e)
+                continue
+        
+        # Calcular área total
+        total_area = sum(room_areas.values())
+        
+        return DimensionAnalysis(
+            total_area=total_area,
+            room_areas=room_areas,
+            wall_lengths=wall_lengths,
+            door_widths=door_widths,
+            total_dimensions=len(all_dimensions),
+            rooms_count=len(room_areas)
+        )
     
-    def _analyze_compliance(self, document_analysis: Dict[str, Any], 
-                          plan_analysis: Dict[str, Any], 
-                          dimension_analysis: Dict[str, Any], 
-                          project_type: str) -> Dict[str, Any]:
+    @_safe_default("Error en análisis de cumplimiento", ComplianceAnalysis)
+    def _analyze_compliance(self, document_analysis: DocumentAnalysis, 
+                          plan_analysis: PlanAnalysisSummary, 
+                          dimension_analysis: DimensionAnalysis, 
+                          project_type: str) -> ComplianceAnalysis:
         """Análisis de cumplimiento normativo"""
-        try:
-            self.logger.info("Verificando cumplimiento normativo...")
-            
-            # Verificar cumplimiento de dimensiones
-            dimension_compliance = self._check_dimension_compliance(dimension_analysis)
-            
-            # Verificar cumplimiento de accesibilidad
-            accessibility_compliance = self._check_accessibility_compliance(plan_analysis)
-            
-            # Verificar cumplimiento de seguridad contra incendios
-            fire_safety_compliance = self._check_fire_safety_compliance(plan_analysis)
-            
-            # Verificar cumplimiento estructural
-            structural_compliance = self._check_structural_compliance(plan_analysis)
-            
-            # Verificar cumplimiento general
-            overall_compliance = (
-                dimension_compliance + accessibility_compliance + 
-                fire_safety_compliance + structural_compliance
-            ) / 4
-            
-            return {
-                'dimension_compliance': dimension_compliance,
-                'accessibility_compliance': accessibility_compliance,
-                'fire_safety_compliance': fire_safety_compliance,
-                'structural_compliance': structural_compliance,
-                'overall_compliance': overall_compliance,
-                'project_type': project_type
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis de cumplimiento: {e}")
-            return {}
+        self.logger.info("Verificando cumplimiento normativo...")
+        
+        # Verificar cumplimiento de dimensiones
+        dimension_compliance = self._check_dimension_compliance(dimension_analysis)
+        
+        # Verificar cumplimiento de accesibilidad, seguridad contra incendios y estructural
+        (accessibility_compliance, fire_safety_compliance,
+         structural_compliance) = self._check_plan_compliances(plan_analysis)
+        
+        # Verificar cumplimiento general
+        overall_compliance = (
+            dimension_compliance + accessibility_compliance + 
+            fire_safety_compliance + structural_compliance
+        ) / 4
+        
+        return ComplianceAnalysis(
+            dimension_compliance=dimension_compliance,
+            accessibility_compliance=accessibility_compliance,
+            fire_safety_compliance=fire_safety_compliance,
+            structural_compliance=structural_compliance,
+            overall_compliance=overall_compliance,
+            project_type=project_type
+        )
     
+    @_safe_default("Error detectando ambigüedades", lambda: ([], AmbiguityTable()))
     def _detect_and_resolve_ambiguities(self, project_id: str, document_analysis: Dict[str, Any],
                                       plan_analysis: Dict[str, Any], 
-                                      dimension_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+                                      dimension_analysis: Dict[str, Any]
+                                      ) -> Tuple[List[Dict[str, Any]], AmbiguityTable]:
         """Detecta y resuelve ambigüedades (Fase 3)"""
-        try:
-            self.logger.info("Detectando y resolviendo ambigüedades...")
-            
-            # Crear datos del proyecto para el resolutor
-            project_data = {
-                'id': project_id,
-                'compliance_issues': []  # Se llenará con problemas de cumplimiento
-            }
-            
-            # Detectar ambigüedades
-            ambiguities = self.ambiguity_resolver.detect_ambiguities(
-                project_data, document_analysis, plan_analysis
-            )
-            
-            # Resolver ambigüedades automáticamente
-            resolved_ambiguities = []
-            for ambiguity in ambiguities:
-                try:
-                    resolution = self.ambiguity_resolver.resolve_ambiguity(ambiguity)
-                    if resolution:
-                        resolved_ambiguities.append({
-                            'ambiguity': ambiguity.__dict__,
-                            'resolution': resolution.__dict__
-                        })
-                except Exception as e:
-                    self.logger.error(f"Error resolviendo ambigüedad {ambiguity.ambiguity_id}: {e}")
+        self.logger.info("Detectando y resolviendo ambigüedades...")
+        
+        # Crear datos del proyecto para el resolutor
+        project_data = {
+            'id': project_id,
+            'compliance_issues': []  # Se llenará con problemas de cumplimiento
+        }
+        
+        # Detectar ambigüedades
+        ambiguities = self.ambiguity_resolver.detect_ambiguities(
+            project_data, document_analysis, plan_analysis
+        )
+        
+        # Resolver ambigüedades automáticamente
+        resolved_ambiguities = []
+        ambiguity_table = AmbiguityTable()
+        for ambiguity in ambiguities:
+            try:
+                resolution = self.ambiguity_resolver.resolve_ambiguity(ambiguity)
+                if resolution:
                     resolved_ambiguities.append({
                         'ambiguity': ambiguity.__dict__,
-                        'resolution': None
+                        'resolution': resolution.__dict__
                     })
-            
-            return resolved_ambiguities
-            
-        except Exception as e:
-            self.logger.error(f"Error detectando ambigüedades: {e}")
-            return []
+                    ambiguity_table.append(ambiguity.ambiguity_id, ambiguity.severity, ambiguity.description)
+            except Exception as e:
+                self.logger.error("Error resolviendo ambigüedad %s: %s", ambiguity.ambiguity_id, e)
+                resolved_ambiguities.append({
+                    'ambiguity': ambiguity.__dict__,
+                    'resolution': None
+                })
+                ambiguity_table.append(ambiguity.ambiguity_id, ambiguity.severity, ambiguity.description)
+        
+        return resolved_ambiguities, ambiguity_table
     
+    @_safe_default("Error generando preguntas inteligentes", list)
     def _generate_intelligent_questions(self, project_id: str, document_analysis: Dict[str, Any],
                                       plan_analysis: Dict[str, Any], 
                                       dimension_analysis: Dict[str, Any],
                                       ambiguities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Genera preguntas inteligentes (Fase 3)"""
-        try:
-            self.logger.info("Generando preguntas inteligentes...")
-            
-            # Crear contexto para el motor de preguntas
-            context = QuestionContext(
-                project_data={'id': project_id},
-                document_analysis=document_analysis,
-                plan_analysis=plan_analysis,
-                dimension_analysis=dimension_analysis,
-                compliance_issues=[],
-                previous_questions=[]
-            )
-            
-            # Generar preguntas inteligentes
-            questions = self.question_engine.generate_intelligent_questions(context)
-            
-            # Convertir a diccionarios para serialización
-            questions_dict = []
-            for question in questions:
-                questions_dict.append(question.__dict__)
-            
-            return questions_dict
-            
-        except Exception as e:
-            self.logger.error(f"Error generando preguntas inteligentes: {e}")
-            return []
+        self.logger.info("Generando preguntas inteligentes...")
+        
+        # Crear contexto para el motor de preguntas
+        context = QuestionContext(
+            project_data={'id': project_id},
+            document_analysis=document_analysis,
+            plan_analysis=plan_analysis,
+            dimension_analysis=dimension_analysis,
+            compliance_issues=[],
+            previous_questions=[]
+        )
+        
+        # Generar preguntas inteligentes
+        questions = self.question_engine.generate_intelligent_questions(context)
+        
+        # Convertir a diccionarios para serialización
+        questions_dict = []
+        for question in questions:
+            questions_dict.append(question.__dict__)
+        
+        return questions_dict
     
+    @_safe_default("Error construyendo grafo de conocimiento", dict)
     def _build_knowledge_graph(self, project_id: str, document_analysis: Dict[str, Any],
                              plan_analysis: Dict[str, Any], dimension_analysis: Dict[str, Any],
                              compliance_analysis: Dict[str, Any], ambiguities: List[Dict[str, Any]],
                              questions: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Construye el grafo de conocimiento (Fase 3)"""
-        try:
-            self.logger.info("Construyendo grafo de conocimiento...")
-            
-            # Obtener grafo de conocimiento del proyecto
-            knowledge_graph = self.neo4j_manager.get_project_knowledge_graph(project_id)
-            
+        self.logger.info("Construyendo grafo de conocimiento...")
+        
+        # Usar los conteos registrados al escribir, sin releer Neo4j
+        with self._graph_counts_lock:
+            graph_counts = self._graph_counts.pop(project_id, None)
+        
+        if graph_counts and graph_counts['nodes']:
             return {
-                'total_nodes': knowledge_graph.metadata.get('total_nodes', 0),
-                'total_relationships': knowledge_graph.metadata.get('total_relationships', 0),
-                'node_types': self._get_node_types(knowledge_graph.nodes),
-                'relationship_types': self._get_relationship_types(knowledge_graph.relationships)
+                'total_nodes': sum(graph_counts['nodes'].values()),
+                'total_relationships': sum(graph_counts['relationships'].values()),
+                'node_types': dict(graph_counts['nodes']),
+                'relationship_types': dict(graph_counts['relationships'])
             }
-            
-        except Exception as e:
-            self.logger.error(f"Error construyendo grafo de conocimiento: {e}")
-            return {}
+        
+        # Obtener grafo de conocimiento del proyecto
+        knowledge_graph = self.neo4j_manager.get_project_knowledge_graph(project_id)
+        
+        return {
+            'total_nodes': knowledge_graph.metadata.get('total_nodes', 0),
+            'total_relationships': knowledge_graph.metadata.get('total_relationships', 0),
+            'node_types': self._get_node_types(knowledge_graph.nodes),
+            'relationship_types': self._get_relationship_types(knowledge_graph.relationships)
+        }
     
-    def _perform_advanced_nlp_analysis(self, document_analysis: Dict[str, Any], 
-                                     project_id: str) -> Dict[str, Any]:
+    def _record_graph_write(self, project_id: str, node_type: Optional[str] = None,
+                            relationship_type: Optional[str] = None):
+        """Registra un nodo y/o una relación escritos en Neo4j"""
+        with self._graph_counts_lock:
+            counts = self._graph_counts.setdefault(
+                project_id, {'nodes': Counter(), 'relationships': Counter()}
+            )
+            if node_type:
+                counts['nodes'][node_type] += 1
+            if relationship_type:
+                counts['relationships'][relationship_type] += 1
+    
+    def _link_graph_nodes(self, project_id: str, source_id: str, target_id: str, link_kind: str,
+                          relationship_type: str = 'CONTAINS'):
+        """Crea una relación en Neo4j y la registra solo si realmente se ha escrito"""
+        if self.neo4j_manager.create_relationship(
+            source_id, target_id, relationship_type, {"relationship_type": link_kind}
+        ):
+            self._record_graph_write(project_id, relationship_type=relationship_type)
+    
+    @_safe_default("Error en análisis NLP avanzado", NLPAnalysis)
+    def _perform_advanced_nlp_analysis(self, document_analysis: DocumentAnalysis, 
+                                     project_id: str) -> NLPAnalysis:
         """Realiza análisis NLP avanzado"""
+        self.logger.info("Realizando análisis NLP avanzado...")
+        
+        extracted_text = self._load_extracted_text(document_analysis)
+        
+        # Análisis de coherencia
+        coherence = self.nlp_processor.analyze_coherence(extracted_text)
+        
+        # Análisis de complejidad
+        complexity = self.nlp_processor.analyze_complexity(extracted_text)
+        
+        # Análisis de legibilidad
+        readability = self.nlp_processor.analyze_readability(extracted_text)
+        
+        return NLPAnalysis(
+            coherence_score=coherence.get('score', 0.0),
+            complexity_score=complexity.get('score', 0.0),
+            readability_score=readability.get('score', 0.0),
+            analysis_confidence=(coherence.get('confidence', 0.0) + 
+                                 complexity.get('confidence', 0.0) + 
+                                 readability.get('confidence', 0.0)) / 3
+        )
+    
+    def _load_extracted_text(self, document_analysis: DocumentAnalysis) -> str:
+        """Carga bajo demanda el texto OCR volcado a disco por _analyze_documents_advanced"""
+        text_path = document_analysis.extracted_text_path
+        if text_path and os.path.exists(text_path):
+            with open(text_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        
+        return document_analysis.extracted_text_preview
+    
+    def _remove_extracted_text(self, document_analysis: DocumentAnalysis):
+        """Borra el texto OCR volcado a disco por _analyze_documents_advanced"""
+        text_path = document_analysis.extracted_text_path
+        if not text_path:
+            return
         try:
-            self.logger.info("Realizando análisis NLP avanzado...")
-            
-            extracted_text = document_analysis.get('extracted_text', '')
-            
-            # Análisis de coherencia
-            coherence = self.nlp_processor.analyze_coherence(extracted_text)
-            
-            # Análisis de complejidad
-            complexity = self.nlp_processor.analyze_complexity(extracted_text)
-            
-            # Análisis de legibilidad
-            readability = self.nlp_processor.analyze_readability(extracted_text)
-            
-            return {
-                'coherence_score': coherence.get('score', 0.0),
-                'complexity_score': complexity.get('score', 0.0),
-                'readability_score': readability.get('score', 0.0),
-                'analysis_confidence': (coherence.get('confidence', 0.0) + 
-                                     complexity.get('confidence', 0.0) + 
-                                     readability.get('confidence', 0.0)) / 3
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis NLP avanzado: {e}")
-            return {}
+            os.unlink(text_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning("No se pudo borrar el texto OCR temporal %s: %s", text_path, e)
     
-    def _perform_rule_analysis(self, document_analysis: Dict[str, Any], 
+    @_safe_default("Error en análisis con motor de reglas", RuleAnalysis)
+    def _perform_rule_analysis(self, document_analysis: DocumentAnalysis, 
                              plan_analysis: Dict[str, Any], 
                              dimension_analysis: Dict[str, Any],
-                             compliance_analysis: Dict[str, Any]) -> Dict[str, Any]:
+                             compliance_analysis: Dict[str, Any]) -> RuleAnalysis:
         """Realiza análisis con motor de reglas"""
-        try:
-            self.logger.info("Realizando análisis con motor de reglas...")
-            
-            # Crear contexto para el motor de reglas
-            context = {
-                'document_data': document_analysis.get('extracted_data', {}),
-                'plan_data': plan_analysis,
-                'dimension_data': dimension_analysis,
-                'compliance_data': compliance_analysis
-            }
-            
-            # Ejecutar reglas de cumplimiento
-            rule_results = self.rule_engine.evaluate_rules(context)
-            
-            return {
-                'rules_evaluated': rule_results.get('total_rules', 0),
-                'rules_passed': rule_results.get('passed_rules', 0),
-                'rules_failed': rule_results.get('failed_rules', 0),
-                'compliance_score': rule_results.get('compliance_score', 0.0),
-                'violations': rule_results.get('violations', [])
-            }
-            
-        except Exception as e:
-            self.logger.error(f"Error en análisis con motor de reglas: {e}")
-            return {}
+        self.logger.info("Realizando análisis con motor de reglas...")
+        
+        # Crear contexto para el motor de reglas
+        context = {
+            'document_data': document_analysis.extracted_data,
+            'plan_data': plan_analysis,
+            'dimension_data': dimension_analysis,
+            'compliance_data': compliance_analysis
+        }
+        
+        # Ejecutar reglas de cumplimiento
+        rule_results = self.rule_engine.evaluate_rules(context)
+        
+        return RuleAnalysis(
+            rules_evaluated=rule_results.get('total_rules', 0),
+            rules_passed=rule_results.get('passed_rules', 0),
+            rules_failed=rule_results.get('failed_rules', 0),
+            compliance_score=rule_results.get('compliance_score', 0.0),
+            violations=rule_results.get('violations', [])
+        )
     
+    @_safe_default("Error generando reporte integral", str)
     def _generate_comprehensive_report(self, project_id: str, document_analysis: Dict[str, Any],
                                      plan_analysis: Dict[str, Any], dimension_analysis: Dict[str, Any],
                                      compliance_analysis: Dict[str, Any], nlp_analysis: Dict[str, Any],
                                      rule_analysis: Dict[str, Any], ambiguities: List[Dict[str, Any]],
                                      questions: List[Dict[str, Any]]) -> str:
         """Genera reporte integral"""
-        try:
-            self.logger.info("Generando reporte integral...")
-            
-            # Crear datos del proyecto
-            project_data = {
-                'id': project_id,
-                'name': f"Proyecto {project_id}",
-                'type': 'residential'
-            }
-            
-            # Crear resultados de análisis
-            analysis_results = {
-                'document_analysis': document_analysis,
-                'plan_analysis': plan_analysis,
-                'dimension_analysis': dimension_analysis,
-                'compliance_check': compliance_analysis,
-                'nlp_analysis': nlp_analysis,
-                'rule_analysis': rule_analysis,
-                'ambiguities': ambiguities,
-                'questions': questions
-            }
-            
-            # Generar reporte
-            report = self.report_generator.generate_comprehensive_report(
-                project_data, analysis_results
-            )
-            
-            return report.file_path if report else ""
-            
-        except Exception as e:
-            self.logger.error(f"Error generando reporte integral: {e}")
-            return ""
-    
-    def _calculate_overall_score(self, document_analysis: Dict[str, Any], 
-                               plan_analysis: Dict[str, Any], 
-                               dimension_analysis: Dict[str, Any],
-                               compliance_analysis: Dict[str, Any], 
-                               nlp_analysis: Dict[str, Any],
-                               rule_analysis: Dict[str, Any]) -> float:
+        self.logger.info("Generando reporte integral...")
+        
+        # Crear datos del proyecto
+        project_data = {
+            'id': project_id,
+            'name': f"Proyecto {project_id}",
+            'type': 'residential'
+        }
+        
+        # Crear resultados de análisis
+        analysis_results = {
+            'document_analysis': document_analysis,
+            'plan_analysis': plan_analysis,
+            'dimension_analysis': dimension_analysis,
+            'compliance_check': compliance_analysis,
+            'nlp_analysis': nlp_analysis,
+            'rule_analysis': rule_analysis,
+            'ambiguities': ambiguities,
+            'questions': questions
+        }
+        
+        # Generar reporte
+        report = self.report_generator.generate_comprehensive_report(
+            project_data, analysis_results
+        )
+        
+        return report.file_path if report else ""
+    
+    @_safe_default("Error calculando puntuación general", float)
+    def _calculate_overall_score(self, document_analysis: DocumentAnalysis, 
+                               plan_analysis: PlanAnalysisSummary, 
+                               dimension_analysis: DimensionAnalysis,
+                               compliance_analysis: ComplianceAnalysis, 
+                               nlp_analysis: NLPAnalysis,
+                               rule_analysis: RuleAnalysis) -> float:
         """Calcula la puntuación general del proyecto"""
-        try:
-            # Ponderaciones para cada componente
-            weights = {
-                'document_confidence': 0.15,
-                'plan_compliance': 0.25,
-                'dimension_compliance': 0.20,
-                'compliance_overall': 0.25,
-                'nlp_analysis': 0.10,
-                'rule_analysis': 0.05
-            }
-            
-            # Calcular puntuaciones individuales
-            doc_score = document_analysis.get('confidence_score', 0.0) * 10
-            plan_score = plan_analysis.get('overall_compliance', 0.0) * 10
-            dim_score = dimension_analysis.get('compliance_score', 0.0) * 10
-            comp_score = compliance_analysis.get('overall_compliance', 0.0) * 10
-            nlp_score = nlp_analysis.get('analysis_confidence', 0.0) * 10
-            rule_score = rule_analysis.get('compliance_score', 0.0) * 10
-            
-            # Calcular puntuación ponderada
-            overall_score = (
-                doc_score * weights['document_confidence'] +
-                plan_score * weights['plan_compliance'] +
-                dim_score * weights['dimension_compliance'] +
-                comp_score * weights['compliance_overall'] +
-                nlp_score * weights['nlp_analysis'] +
-                rule_score * weights['rule_analysis']
-            )
-            
-            return min(10.0, max(0.0, overall_score))
-            
-        except Exception as e:
-            self.logger.error(f"Error calculando puntuación general: {e}")
-            return 0.0
+        # La puntuación ponderada se memoiza sobre las seis puntuaciones parciales
+        return _weighted_overall_score(self._extract_score_key(
+            document_analysis, plan_analysis, dimension_analysis,
+            compliance_analysis, nlp_analysis, rule_analysis
+        ))
+    
+    @staticmethod
+    def _extract_score_key(document_analysis: DocumentAnalysis, 
+                           plan_analysis: PlanAnalysisSummary, 
+                           dimension_analysis: DimensionAnalysis,
+                           compliance_analysis: ComplianceAnalysis, 
+                           nlp_analysis: NLPAnalysis,
+                           rule_analysis: RuleAnalysis) -> Tuple[float, ...]:
+        """Extrae las puntuaciones parciales (mismo orden que SCORE_WEIGHTS)"""
+        return (
+            float(document_analysis.confidence_score),
+            float(plan_analysis.overall_compliance),
+            float(dimension_analysis.compliance_score),
+            float(compliance_analysis.overall_compliance),
+            float(nlp_analysis.analysis_confidence),
+            float(rule_analysis.compliance_score)
+        )
     
-    def _identify_critical_issues(self, compliance_analysis: Dict[str, Any],
-                                ambiguities: List[Dict[str, Any]], 
-                                plan_analysis: Dict[str, Any]) -> List[str]:
+    @_safe_default("Error identificando problemas críticos", list)
+    def _identify_critical_issues(self, compliance_analysis: ComplianceAnalysis,
+                                ambiguities: AmbiguityTable, 
+                                plan_analysis: PlanAnalysisSummary) -> List[str]:
         """Identifica problemas críticos"""
-        try:
-            critical_issues = []
-            
-            # Problemas de cumplimiento críticos
-            if compliance_analysis.get('overall_compliance', 0) < 0.6:
-                critical_issues.append("Cumplimiento normativo insuficiente")
-            
-            if compliance_analysis.get('accessibility_compliance', 0) < 0.5:
-                critical_issues.append("Problemas críticos de accesibilidad")
-            
-            if compliance_analysis.get('fire_safety_compliance', 0) < 0.5:
-                critical_issues.append("Problemas críticos de seguridad contra incendios")
-            
-            # Ambigüedades de alta severidad
-            for ambiguity in ambiguities:
-                if ambiguity.get('ambiguity', {}).get('severity') == 'HIGH':
-                    critical_issues.append(f"Ambigüedad crítica: {ambiguity.get('ambiguity', {}).get('description', '')}")
-            
-            # Problemas de planos
-            if len(plan_analysis.get('accessibility_issues', [])) > 5:
-                critical_issues.append("Múltiples problemas de accesibilidad en planos")
-            
-            if len(plan_analysis.get('fire_safety_issues', [])) > 3:
-                critical_issues.append("Múltiples problemas de seguridad contra incendios")
-            
-            return critical_issues
-            
-        except Exception as e:
-            self.logger.error(f"Error identificando problemas críticos: {e}")
-            return []
+        critical_issues = []
+        add_issue = critical_issues.append
+        
+        # Problemas de cumplimiento críticos
+        if compliance_analysis.overall_compliance < _CRITICAL_COMPLIANCE_SAFE_LEVEL:
+            for attribute, threshold, message in _CRITICAL_COMPLIANCE_RULES:
+                if getattr(compliance_analysis, attribute) < threshold:
+                    add_issue(message)
+        
+        # Ambigüedades de alta severidad (solo se formatean las descripciones seleccionadas)
+        descriptions = ambiguities.descriptions
+        high_indices = [i for i, severity in enumerate(ambiguities.severities) if severity == Severity.HIGH]
+        critical_issues.extend(f"Ambigüedad crítica: {descriptions[i]}" for i in high_indices)
+        
+        # Problemas de planos
+        if len(plan_analysis.accessibility_issues) > 5:
+            add_issue("Múltiples problemas de accesibilidad en planos")
+        
+        if len(plan_analysis.fire_safety_issues) > 3:
+            add_issue("Múltiples problemas de seguridad contra incendios")
+        
+        return critical_issues
     
+    @_safe_default("Error generando recomendaciones", list)
     def _generate_recommendations(self, overall_score: float, critical_issues: List[str],
-                                compliance_analysis: Dict[str, Any], 
-                                ambiguities: List[Dict[str, Any]]) -> List[str]:
+                                compliance_analysis: ComplianceAnalysis, 
+                                ambiguities: AmbiguityTable) -> List[str]:
         """Genera recomendaciones"""
-        try:
-            recommendations = []
-            
-            # Recomendaciones basadas en puntuación general
-            if overall_score < 5.0:
-                recommendations.append("Revisión completa del proyecto requerida")
-            elif overall_score < 7.0:
-                recommendations.append("Mejoras significativas recomendadas")
-            else:
-                recommendations.append("Proyecto en buen estado, optimizaciones menores")
-            
-            # Recomendaciones específicas por área
-            if compliance_analysis.get('accessibility_compliance', 0) < 0.7:
-                recommendations.append("Mejorar accesibilidad universal del proyecto")
-            
-            if compliance_analysis.get('fire_safety_compliance', 0) < 0.7:
-                recommendations.append("Reforzar medidas de seguridad contra incendios")
-            
-            # Recomendaciones para ambigüedades
-            if len(ambiguities) > 10:
-                recommendations.append("Resolver ambigüedades pendientes antes de continuar")
-            
-            return recommendations
-            
-        except Exception as e:
-            self.logger.error(f"Error generando recomendaciones: {e}")
-            return []
+        recommendations = []
+        add_recommendation = recommendations.append
+        
+        # Recomendaciones basadas en puntuación general
+        add_recommendation(_SCORE_BAND_RECOMMENDATIONS[bisect_right(_SCORE_BAND_LIMITS, overall_score)])
+        
+        # Recomendaciones específicas por área (también con puntuación excelente: un área
+        # puede quedar por debajo de su umbral aunque la media sea alta)
+        for attribute, threshold, message in _RECOMMENDATION_COMPLIANCE_RULES:
+            if getattr(compliance_analysis, attribute) < threshold:
+                add_recommendation(message)
+        
+        # Recomendaciones para ambigüedades
+        if len(ambiguities) > 10:
+            add_recommendation("Resolver ambigüedades pendientes antes de continuar")
+        
+        return recommendations
     
     def _calculate_plan_compliance(self, elements: List[Dict[str, Any]], 
                                  accessibility_issues: List[str],
                                  fire_safety_issues: List[str], 
                                  structural_issues: List[str]) -> float:
         """Calcula cumplimiento de planos"""
-        try:
-            total_issues = len(accessibility_issues) + len(fire_safety_issues) + len(structural_issues)
-            total_elements = len(elements)
-            
-            if total_elements == 0:
-                return 0.0
-            
-            # Calcular puntuación basada en problemas vs elementos
-            issue_ratio = total_issues / total_elements
-            compliance = max(0.0, 1.0 - issue_ratio)
-            
-            return compliance
-            
-        except Exception as e:
-            self.logger.error(f"Error calculando cumplimiento de planos: {e}")
+        total_issues = len(accessibility_issues) + len(fire_safety_issues) + len(structural_issues)
+        total_elements = len(elements)
+        
+        if total_elements == 0:
             return 0.0
+        
+        # Calcular puntuación basada en problemas vs elementos
+        issue_ratio = total_issues / total_elements
+        compliance = max(0.0, 1.0 - issue_ratio)
+        
+        return compliance
     
-    def _check_dimension_compliance(self, dimension_analysis: Dict[str, Any]) -> float:
+    def _check_dimension_compliance(self, dimension_analysis: DimensionAnalysis) -> float:
         """Verifica cumplimiento de dimensiones"""
-        try:
-            room_areas = dimension_analysis.get('room_areas', {})
-            door_widths = dimension_analysis.get('door_widths', [])
-            
-            compliance_score = 0.0
-            total_checks = 0
-            
-            # Verificar áreas mínimas de habitaciones
-            for room_name, area in room_areas.items():
-                total_checks += 1
-                if area >= 9.0:  # Área mínima de habitaciones
-                    compliance_score += 1.0
-            
-            # Verificar anchos mínimos de puertas
-            for width in door_widths:
-                total_checks += 1
-                if width >= 0.8:  # Ancho mínimo de puertas
-                    compliance_score += 1.0
-            
-            return compliance_score / total_checks if total_checks > 0 else 0.0
-            
-        except Exception as e:
-            self.logger.error(f"Error verificando cumplimiento de dimensiones: {e}")
-            return 0.0
-    
-    def _check_accessibility_compliance(self, plan_analysis: Dict[str, Any]) -> float:
-        """Verifica cumplimiento de accesibilidad"""
-        try:
-            accessibility_issues = plan_analysis.get('accessibility_issues', [])
-            
-            # Puntuación base
-            base_score = 1.0
-            
-            # Penalizar por problemas de accesibilidad
-            penalty = len(accessibility_issues) * 0.1
-            
-            return max(0.0, base_score - penalty)
-            
-        except Exception as e:
-            self.logger.error(f"Error verificando cumplimiento de accesibilidad: {e}")
-            return 0.0
-    
-    def _check_fire_safety_compliance(self, plan_analysis: Dict[str, Any]) -> float:
-        """Verifica cumplimiento de seguridad contra incendios"""
-        try:
-            fire_safety_issues = plan_analysis.get('fire_safety_issues', [])
-            
-            # Puntuación base
-            base_score = 1.0
-            
-            # Penalizar por problemas de seguridad contra incendios
-            penalty = len(fire_safety_issues) * 0.15
-            
-            return max(0.0, base_score - penalty)
-            
-        except Exception as e:
-            self.logger.error(f"Error verificando cumplimiento de seguridad contra incendios: {e}")
+        room_areas = dimension_analysis.room_areas
+        door_widths = dimension_analysis.door_widths
+        
+        areas = np.fromiter(room_areas.values(), dtype=np.float64, count=len(room_areas))
+        widths = np.asarray(door_widths, dtype=np.float64)
+        
+        total_checks = areas.size + widths.size
+        if total_checks == 0:
             return 0.0
+        
+        # Áreas mínimas de habitaciones (9 m²) y anchos mínimos de puertas (0.8 m)
+        compliance_score = int(np.count_nonzero(areas >= 9.0)) + int(np.count_nonzero(widths >= 0.8))
+        
+        return compliance_score / total_checks
     
-    def _check_structural_compliance(self, plan_analysis: Dict[str, Any]) -> float:
-        """Verifica cumplimiento estructural"""
-        try:
-            structural_issues = plan_analysis.get('structural_issues', [])
-            
-            # Puntuación base
-            base_score = 1.0
-            
-            # Penalizar por problemas estructurales
-            penalty = len(structural_issues) * 0.2
-            
-            return max(0.0, base_score - penalty)
-            
-        except Exception as e:
-            self.logger.error(f"Error verificando cumplimiento estructural: {e}")
-            return 0.0
+    def _check_plan_compliances(self, plan_analysis: PlanAnalysisSummary) -> Tuple[float, float, float]:
+        """Verifica cumplimiento de accesibilidad, seguridad contra incendios y estructural"""
+        # Puntuación base 1.0, penalizada por cada problema de cada categoría
+        return (
+            _issue_penalty_score(len(plan_analysis.accessibility_issues), 0.1),
+            _issue_penalty_score(len(plan_analysis.fire_safety_issues), 0.15),
+            _issue_penalty_score(len(plan_analysis.structural_issues), 0.2),
+        )
     
+    @_safe_default("Error contando archivos procesados", int)
     def _count_processed_files(self, memory_file: str, plans_directory: str) -> int:
         """Cuenta archivos procesados"""
-        try:
-            count = 0
-            
-            # Contar archivo de memoria
-            if os.path.exists(memory_file):
-                count += 1
-            
-            # Contar archivos de planos
-            if os.path.exists(plans_directory):
-                plan_files = [f for f in os.listdir(plans_directory) if f.lower().endswith('.pdf')]
-                count += len(plan_files)
-            
-            return count
-            
-        except Exception as e:
-            self.logger.error(f"Error contando archivos procesados: {e}")
-            return 0
+        count = 0
+        
+        # Contar archivo de memoria
+        if os.path.isfile(memory_file):
+            count += 1
+        
+        # Contar archivos de planos (DirEntry evita un stat adicional por archivo)
+        if os.path.isdir(plans_directory):
+            with os.scandir(plans_directory) as entries:
+                count += sum(
+                    1 for entry in entries
+                    if entry.is_file(follow_symlinks=False) and entry.name.endswith(_PDF_SUFFIXES)
+                )
+        
+        return count
     
     def _get_node_types(self, nodes: List) -> Dict[str, int]:
         """Obtiene tipos de nodos en el grafo"""
-        try:
-            node_types = {}
-            for node in nodes:
-                node_type = node.node_type
-                node_types[node_type] = node_types.get(node_type, 0) + 1
-            return node_types
-        except Exception as e:
-            self.logger.error(f"Error obteniendo tipos de nodos: {e}")
-            return {}
+        return dict(Counter(node.node_type for node in nodes))
     
     def _get_relationship_types(self, relationships: List) -> Dict[str, int]:
         """Obtiene tipos de relaciones en el grafo"""
-        try:
-            rel_types = {}
-            for rel in relationships:
-                rel_type = rel.relationship_type
-                rel_types[rel_type] = rel_types.get(rel_type, 0) + 1
-            return rel_types
-        except Exception as e:
-            self.logger.error(f"Error obteniendo tipos de relaciones: {e}")
-            return {}
+        return dict(Counter(rel.relationship_type for rel in relationships))
     
+    @_safe_default("Error iniciando conversación")
     def start_conversation(self, project_id: str, user_id: str = "user") -> str:
         """Inicia una conversación para el proyecto"""
-        try:
-            session = self.conversational_ai.start_conversation(user_id, project_id)
-            return session.session_id if session else None
-        except Exception as e:
-            self.logger.error(f"Error iniciando conversación: {e}")
-            return None
+        session = self.conversational_ai.start_conversation(user_id, project_id)
+        return session.session_id if session else None
     
+    @_safe_default("Error procesando mensaje", lambda: _CONVERSATION_ERROR_MESSAGE)
     def process_conversation_message(self, session_id: str, message: str) -> str:
         """Procesa un mensaje en la conversación"""
-        try:
-            return self.conversational_ai.process_message(session_id, message)
-        except Exception as e:
-            self.logger.error(f"Error procesando mensaje: {e}")
-            return "Lo siento, ha ocurrido un error. Por favor, intenta de nuevo."
+        return self.conversational_ai.process_message(session_id, message)
     
+    @_safe_default("Error cerrando analizador")
     def close(self):
         """Cierra el analizador y libera recursos"""
-        try:
-            if hasattr(self, 'neo4j_manager'):
-                self.neo4j_manager.close()
-            self.logger.info("Enhanced Project Analyzer V4 cerrado correctamente")
-        except Exception as e:
-            self.logger.error(f"Error cerrando analizador: {e}")
+        if hasattr(self, 'neo4j_manager'):
+            self.neo4j_manager.close()
+        self.logger.info("Enhanced Project Analyzer V4 cerrado correctamente")
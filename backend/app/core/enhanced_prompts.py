@@ -3,6 +3,8 @@ Enhanced AI prompts for comprehensive document analysis and compliance checking.
 Optimized for Groq API (Llama 3.3 70B) with robust data extraction and contradiction detection.
 """
 
+from string import Formatter
+
 # =============================================================================
 # STRUCTURED DATA EXTRACTION PROMPTS
 # =============================================================================
@@ -554,57 +556,104 @@ Responde ÚNICAMENTE en formato JSON con esta estructura:
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def get_structured_data_extraction_prompt(project_text: str) -> str:
+def _compile_template(template: str) -> tuple:
+    """Pre-parse a str.format template into (literal, field_name) parts."""
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in Formatter().parse(template)
+    )
+
+def _render_template(parts: tuple, **fields) -> str:
+    """Render a pre-parsed template without re-scanning its braces."""
+    return ''.join(
+        literal if field_name is None else literal + str(fields[field_name])
+        for literal, field_name in parts
+    )
+
+class LazyPrompt:
+    """Prompt whose text is only rendered (once) when str() is called on it."""
+    __slots__ = ('_parts', '_fields', '_text')
+
+    def __init__(self, parts: tuple, **fields):
+        self._parts = parts
+        self._fields = fields
+        self._text = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = _render_template(self._parts, **self._fields)
+            self._fields = None
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"<LazyPrompt rendered={self._text is not None}>"
+
+# Templates parsed once at import time
+_STRUCTURED_PROJECT_DATA_EXTRACTION_PARTS = _compile_template(STRUCTURED_PROJECT_DATA_EXTRACTION_PROMPT)
+_CONTRADICTION_DETECTION_PARTS = _compile_template(CONTRADICTION_DETECTION_PROMPT)
+_FIRE_SAFETY_COMPLIANCE_PARTS = _compile_template(FIRE_SAFETY_COMPLIANCE_PROMPT)
+_SAFETY_USE_COMPLIANCE_PARTS = _compile_template(SAFETY_USE_COMPLIANCE_PROMPT)
+_ENERGY_EFFICIENCY_COMPLIANCE_PARTS = _compile_template(ENERGY_EFFICIENCY_COMPLIANCE_PROMPT)
+_QUESTION_GENERATION_PARTS = _compile_template(QUESTION_GENERATION_PROMPT)
+_ANSWER_PROCESSING_PARTS = _compile_template(ANSWER_PROCESSING_PROMPT)
+
+def get_structured_data_extraction_prompt(project_text: str) -> LazyPrompt:
     """Get prompt for structured data extraction."""
-    return STRUCTURED_PROJECT_DATA_EXTRACTION_PROMPT.format(
+    return LazyPrompt(
+        _STRUCTURED_PROJECT_DATA_EXTRACTION_PARTS,
         project_text=project_text
     )
 
-def get_contradiction_detection_prompt(memory_text: str, plans_text: str, other_documents: str = "") -> str:
+def get_contradiction_detection_prompt(memory_text: str, plans_text: str, other_documents: str = "") -> LazyPrompt:
     """Get prompt for contradiction detection."""
-    return CONTRADICTION_DETECTION_PROMPT.format(
+    return LazyPrompt(
+        _CONTRADICTION_DETECTION_PARTS,
         memory_text=memory_text,
         plans_text=plans_text,
         other_documents=other_documents
     )
 
-def get_fire_safety_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> str:
+def get_fire_safety_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> LazyPrompt:
     """Get prompt for fire safety compliance checking."""
-    return FIRE_SAFETY_COMPLIANCE_PROMPT.format(
+    return LazyPrompt(
+        _FIRE_SAFETY_COMPLIANCE_PARTS,
         project_data=project_data,
         project_text=project_text,
         normative_text=normative_text
     )
 
-def get_safety_use_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> str:
+def get_safety_use_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> LazyPrompt:
     """Get prompt for safety use compliance checking."""
-    return SAFETY_USE_COMPLIANCE_PROMPT.format(
+    return LazyPrompt(
+        _SAFETY_USE_COMPLIANCE_PARTS,
         project_data=project_data,
         project_text=project_text,
         normative_text=normative_text
     )
 
-def get_energy_efficiency_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> str:
+def get_energy_efficiency_compliance_prompt(project_data: dict, project_text: str, normative_text: str) -> LazyPrompt:
     """Get prompt for energy efficiency compliance checking."""
-    return ENERGY_EFFICIENCY_COMPLIANCE_PROMPT.format(
+    return LazyPrompt(
+        _ENERGY_EFFICIENCY_COMPLIANCE_PARTS,
         project_data=project_data,
         project_text=project_text,
         normative_text=normative_text
     )
 
-def get_question_generation_prompt(project_data: dict, project_text: str, inconsistencies: list) -> str:
+def get_question_generation_prompt(project_data: dict, project_text: str, inconsistencies: list) -> LazyPrompt:
     """Get prompt for question generation."""
-    return QUESTION_GENERATION_PROMPT.format(
+    return LazyPrompt(
+        _QUESTION_GENERATION_PARTS,
         project_data=project_data,
         project_text=project_text,
         inconsistencies=inconsistencies
     )
 
-def get_answer_processing_prompt(project_data: dict, user_answers: dict, original_inconsistencies: list) -> str:
+def get_answer_processing_prompt(project_data: dict, user_answers: dict, original_inconsistencies: list) -> LazyPrompt:
     """Get prompt for answer processing."""
-    return ANSWER_PROCESSING_PROMPT.format(
+    return LazyPrompt(
+        _ANSWER_PROCESSING_PARTS,
         project_data=project_data,
         user_answers=user_answers,
         original_inconsistencies=original_inconsistencies
     )
-
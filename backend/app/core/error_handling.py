@@ -1,16 +1,30 @@
 """
 Sistema de manejo de errores para la aplicación.
 """
+from __future__ import annotations
+
 import logging
+import time
 import traceback
-from typing import Dict, Any, Optional, Union
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import TracebackType
+from typing import Any
 from enum import Enum
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-class ErrorCode(Enum):
-    """Códigos de error del sistema."""
+class ErrorCode(str, Enum):
+    """
+    Códigos de error del sistema.
+    
+    Los miembros son cadenas (equivalente a StrEnum, disponible solo desde
+    Python 3.11): se comparan, se usan como clave y se serializan en JSON
+    directamente como su valor, sin acceder a `.value`.
+    """
+    
+    __str__ = str.__str__
     
     # Errores generales
     UNKNOWN_ERROR = "UNKNOWN_ERROR"
@@ -49,91 +63,208 @@ class ErrorCode(Enum):
     API_ERROR = "API_ERROR"
     TIMEOUT_ERROR = "TIMEOUT_ERROR"
 
-class AIProcessingError(Exception):
+# Códigos de error recuperables y severidad por código (construidos una sola vez)
+_RETRYABLE_ERROR_CODES = frozenset({
+    ErrorCode.AI_RATE_LIMIT,
+    ErrorCode.AI_TIMEOUT,
+    ErrorCode.NETWORK_ERROR,
+    ErrorCode.TIMEOUT_ERROR,
+    ErrorCode.DATABASE_CONNECTION_ERROR
+})
+
+_ERROR_SEVERITIES = {
+    ErrorCode.AI_RATE_LIMIT: "LOW",
+    ErrorCode.VALIDATION_ERROR: "LOW",
+    ErrorCode.AI_SERVICE_ERROR: "MEDIUM",
+    ErrorCode.DATABASE_QUERY_ERROR: "MEDIUM",
+    ErrorCode.DATABASE_CONNECTION_ERROR: "HIGH",
+    ErrorCode.FILE_READ_ERROR: "HIGH"
+}
+
+# Mensajes amigables para el usuario por tipo de error
+_USER_MESSAGES = {
+    'AIProcessingError': 'Error en el servicio de IA. Inténtalo más tarde.',
+    'ValidationError': 'Error de validación en los datos proporcionados.',
+    'DatabaseError': 'Error de conexión a la base de datos.',
+    'FileProcessingError': 'Error al procesar el archivo.'
+}
+
+class _TimestampedError(Exception):
+    """Base de errores con marca de tiempo formateada solo cuando se consulta."""
+    
+    def __init__(self, message: str):
+        super().__init__(message)
+        self._created_at = time.time()
+    
+    @cached_property
+    def timestamp(self) -> str:
+        """Marca de tiempo ISO del momento en que se creó el error."""
+        return datetime.fromtimestamp(self._created_at).isoformat()
+
+class AIProcessingError(_TimestampedError):
     """Error específico para procesamiento de IA."""
     
     def __init__(self, message: str, error_code: ErrorCode = ErrorCode.AI_SERVICE_ERROR, 
-                 details: Optional[Dict[str, Any]] = None):
+                 details: dict[str, Any] | None = None):
         super().__init__(message)
         self.message = message
         self.error_code = error_code
         self.details = details or {}
-        self.timestamp = datetime.now().isoformat()
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> dict[str, Any]:
         """Convertir error a diccionario."""
         return {
             "error_type": "AIProcessingError",
             "message": self.message,
-            "error_code": self.error_code.value,
+            "error_code": self.error_code,
             "details": self.details,
             "timestamp": self.timestamp
         }
 
-class ValidationError(Exception):
+class ValidationError(_TimestampedError):
     """Error de validación."""
     
-    def __init__(self, message: str, field: Optional[str] = None, 
+    def __init__(self, message: str, field: str | None = None, 
                  error_code: ErrorCode = ErrorCode.VALIDATION_ERROR):
         super().__init__(message)
         self.message = message
         self.field = field
         self.error_code = error_code
-        self.timestamp = datetime.now().isoformat()
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> dict[str, Any]:
         """Convertir error a diccionario."""
         return {
             "error_type": "ValidationError",
             "message": self.message,
             "field": self.field,
-            "error_code": self.error_code.value,
+            "error_code": self.error_code,
             "timestamp": self.timestamp
         }
 
-class DatabaseError(Exception):
+class DatabaseError(_TimestampedError):
     """Error de base de datos."""
     
     def __init__(self, message: str, error_code: ErrorCode = ErrorCode.DATABASE_CONNECTION_ERROR,
-                 query: Optional[str] = None):
+                 query: str | None = None):
         super().__init__(message)
         self.message = message
         self.error_code = error_code
         self.query = query
-        self.timestamp = datetime.now().isoformat()
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> dict[str, Any]:
         """Convertir error a diccionario."""
         return {
             "error_type": "DatabaseError",
             "message": self.message,
-            "error_code": self.error_code.value,
+            "error_code": self.error_code,
             "query": self.query,
             "timestamp": self.timestamp
         }
 
-class FileProcessingError(Exception):
+class FileProcessingError(_TimestampedError):
     """Error de procesamiento de archivos."""
     
-    def __init__(self, message: str, file_path: Optional[str] = None,
+    def __init__(self, message: str, file_path: str | None = None,
                  error_code: ErrorCode = ErrorCode.FILE_READ_ERROR):
         super().__init__(message)
         self.message = message
         self.file_path = file_path
         self.error_code = error_code
-        self.timestamp = datetime.now().isoformat()
     
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self) -> dict[str, Any]:
         """Convertir error a diccionario."""
         return {
             "error_type": "FileProcessingError",
             "message": self.message,
             "file_path": self.file_path,
-            "error_code": self.error_code.value,
+            "error_code": self.error_code,
             "timestamp": self.timestamp
         }
 
-def handle_exception(e: Exception, context: str = "Unknown") -> Dict[str, Any]:
+def extract_traceback_frames(tb: TracebackType | None) -> list[dict[str, Any]]:
+    """
+    Extraer los frames de un traceback como datos estructurados.
+    
+    No lee el código fuente de cada línea (lookup_lines=False), a diferencia de
+    traceback.format_exc().
+    
+    Args:
+        tb: Traceback de la excepción
+        
+    Returns:
+        Lista de frames con archivo, línea y función
+    """
+    return _stack_to_frames(_extract_stack(tb))
+
+def _extract_stack(tb: TracebackType | None) -> traceback.StackSummary:
+    """Resumen de los frames de un traceback (sin leer código fuente ni retener los frames)."""
+    return traceback.StackSummary.extract(traceback.walk_tb(tb), lookup_lines=False)
+
+def _stack_to_frames(stack: traceback.StackSummary) -> list[dict[str, Any]]:
+    """Convertir un resumen de frames en una lista de frames con archivo, línea y función."""
+    return [{"file": frame.filename, "line": frame.lineno, "func": frame.name} for frame in stack]
+
+@dataclass
+class ErrorInfo:
+    """
+    Información de un error genérico.
+    
+    Guarda un StackSummary de la excepción (archivo, línea y función de cada
+    frame), no el traceback vivo: los frames y sus variables locales no quedan
+    retenidos. El texto formateado y los frames estructurados se calculan la
+    primera vez que se consultan. to_dict() devuelve el diccionario serializable, con el
+    traceback incluido si se pide.
+    """
+    error_type: str
+    message: str
+    error_code: ErrorCode = ErrorCode.UNKNOWN_ERROR
+    context: str = "Unknown"
+    timestamp: str = ""
+    stack: traceback.StackSummary | None = field(default=None, repr=False, compare=False)
+    
+    @cached_property
+    def traceback_frames(self) -> list[dict[str, Any]]:
+        """Frames estructurados del traceback de la excepción original."""
+        if self.stack is None:
+            return []
+        return _stack_to_frames(self.stack)
+    
+    @cached_property
+    def traceback(self) -> str:
+        """Traceback formateado de la excepción original."""
+        if self.stack is None:
+            return ""
+        return (
+            "Traceback (most recent call last):\n"
+            + "".join(self.stack.format())
+            + f"{self.error_type}: {self.message}\n"
+        )
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Acceso por clave, como en los errores que ya son diccionarios."""
+        if key in _ERROR_INFO_KEYS:
+            return getattr(self, key)
+        return default
+    
+    def to_dict(self, include_traceback: bool = True) -> dict[str, Any]:
+        """Convertir la información del error a diccionario."""
+        data = {
+            "error_type": self.error_type,
+            "message": self.message,
+            "error_code": self.error_code,
+            "context": self.context,
+            "timestamp": self.timestamp
+        }
+        if include_traceback:
+            data["traceback"] = self.traceback
+            data["traceback_frames"] = self.traceback_frames
+        return data
+
+_ERROR_INFO_KEYS = frozenset({
+    "error_type", "message", "error_code", "context", "timestamp", "traceback", "traceback_frames"
+})
+
+def handle_exception(e: Exception, context: str = "Unknown") -> dict[str, Any] | ErrorInfo:
     """
     Manejar excepción y devolver información estructurada.
     
@@ -142,12 +273,14 @@ def handle_exception(e: Exception, context: str = "Unknown") -> Dict[str, Any]:
         context: Contexto donde ocurrió la excepción
         
     Returns:
-        Diccionario con información del error
+        Diccionario con información del error, o ErrorInfo para errores genéricos
     """
     try:
-        # Log del error
-        logger.error(f"Error en {context}: {str(e)}")
-        logger.error(f"Traceback: {traceback.format_exc()}")
+        # Log del error (el traceback solo se extrae si el nivel DEBUG está activo)
+        logger.error("Error en %s: %s", context, e)
+        if logger.isEnabledFor(logging.DEBUG):
+            frames = extract_traceback_frames(e.__traceback__)
+            logger.debug("Traceback: %s", frames, extra={"traceback_frames": frames})
         
         # Si es un error personalizado, usar su método to_dict
         if hasattr(e, 'to_dict'):
@@ -155,18 +288,17 @@ def handle_exception(e: Exception, context: str = "Unknown") -> Dict[str, Any]:
             error_info["context"] = context
             return error_info
         
-        # Error genérico
-        return {
-            "error_type": type(e).__name__,
-            "message": str(e),
-            "error_code": ErrorCode.UNKNOWN_ERROR.value,
-            "context": context,
-            "timestamp": datetime.now().isoformat(),
-            "traceback": traceback.format_exc()
-        }
+        # Error genérico: solo se resumen los frames (el formateo se difiere hasta que se consulte)
+        return ErrorInfo(
+            error_type=type(e).__name__,
+            message=str(e),
+            context=context,
+            timestamp=datetime.now().isoformat(),
+            stack=_extract_stack(e.__traceback__)
+        )
         
     except Exception as handling_error:
-        logger.critical(f"Error al manejar excepción: {handling_error}")
+        logger.critical("Error al manejar excepción: %s", handling_error)
         return {
             "error_type": "ErrorHandlingError",
             "message": f"Error al manejar excepción: {str(handling_error)}",
@@ -175,7 +307,7 @@ def handle_exception(e: Exception, context: str = "Unknown") -> Dict[str, Any]:
             "timestamp": datetime.now().isoformat()
         }
 
-def create_error_response(error_info: Dict[str, Any], status_code: int = 500) -> Dict[str, Any]:
+def create_error_response(error_info: dict[str, Any] | ErrorInfo, status_code: int = 500) -> dict[str, Any]:
     """
     Crear respuesta de error estructurada.
     
@@ -186,6 +318,8 @@ def create_error_response(error_info: Dict[str, Any], status_code: int = 500) ->
     Returns:
         Respuesta de error estructurada
     """
+    if isinstance(error_info, ErrorInfo):
+        error_info = error_info.to_dict()
     return {
         "success": False,
         "error": error_info,
@@ -193,7 +327,7 @@ def create_error_response(error_info: Dict[str, Any], status_code: int = 500) ->
         "timestamp": datetime.now().isoformat()
     }
 
-def log_error(error_info: Dict[str, Any], level: str = "ERROR") -> None:
+def log_error(error_info: dict[str, Any] | ErrorInfo, level: str = "ERROR") -> None:
     """
     Registrar error en logs.
     
@@ -202,25 +336,30 @@ def log_error(error_info: Dict[str, Any], level: str = "ERROR") -> None:
         level: Nivel de log
     """
     try:
-        log_message = f"Error {error_info.get('error_type', 'Unknown')}: {error_info.get('message', 'No message')}"
+        log_args = (
+            "Error %s: %s",
+            error_info.get('error_type', 'Unknown'),
+            error_info.get('message', 'No message')
+        )
         
-        if level.upper() == "CRITICAL":
-            logger.critical(log_message)
-        elif level.upper() == "ERROR":
-            logger.error(log_message)
-        elif level.upper() == "WARNING":
-            logger.warning(log_message)
+        level = level.upper()
+        if level == "CRITICAL":
+            logger.critical(*log_args)
+        elif level == "ERROR":
+            logger.error(*log_args)
+        elif level == "WARNING":
+            logger.warning(*log_args)
         else:
-            logger.info(log_message)
+            logger.info(*log_args)
             
         # Log de detalles si están disponibles
-        if error_info.get('details'):
-            logger.debug(f"Error details: {error_info['details']}")
+        if logger.isEnabledFor(logging.DEBUG) and error_info.get('details'):
+            logger.debug("Error details: %s", error_info['details'])
             
     except Exception as e:
-        logger.critical(f"Error al registrar error: {e}")
+        logger.critical("Error al registrar error: %s", e)
 
-def is_retryable_error(error_info: Dict[str, Any]) -> bool:
+def is_retryable_error(error_info: dict[str, Any] | ErrorInfo) -> bool:
     """
     Determinar si un error es recuperable.
     
@@ -230,17 +369,9 @@ def is_retryable_error(error_info: Dict[str, Any]) -> bool:
     Returns:
         True si el error es recuperable
     """
-    retryable_codes = [
-        ErrorCode.AI_RATE_LIMIT.value,
-        ErrorCode.AI_TIMEOUT.value,
-        ErrorCode.NETWORK_ERROR.value,
-        ErrorCode.TIMEOUT_ERROR.value,
-        ErrorCode.DATABASE_CONNECTION_ERROR.value
-    ]
-    
-    return error_info.get('error_code') in retryable_codes
+    return error_info.get('error_code') in _RETRYABLE_ERROR_CODES
 
-def get_error_severity(error_info: Dict[str, Any]) -> str:
+def get_error_severity(error_info: dict[str, Any] | ErrorInfo) -> str:
     """
     Obtener severidad del error.
     
@@ -250,18 +381,9 @@ def get_error_severity(error_info: Dict[str, Any]) -> str:
     Returns:
         Severidad del error (LOW, MEDIUM, HIGH, CRITICAL)
     """
-    error_code = error_info.get('error_code', '')
-    
-    if error_code in [ErrorCode.AI_RATE_LIMIT.value, ErrorCode.VALIDATION_ERROR.value]:
-        return "LOW"
-    elif error_code in [ErrorCode.AI_SERVICE_ERROR.value, ErrorCode.DATABASE_QUERY_ERROR.value]:
-        return "MEDIUM"
-    elif error_code in [ErrorCode.DATABASE_CONNECTION_ERROR.value, ErrorCode.FILE_READ_ERROR.value]:
-        return "HIGH"
-    else:
-        return "CRITICAL"
+    return _ERROR_SEVERITIES.get(error_info.get('error_code', ''), "CRITICAL")
 
-def format_error_for_user(error_info: Dict[str, Any]) -> str:
+def format_error_for_user(error_info: dict[str, Any] | ErrorInfo) -> str:
     """
     Formatear error para mostrar al usuario.
     
@@ -271,16 +393,7 @@ def format_error_for_user(error_info: Dict[str, Any]) -> str:
     Returns:
         Mensaje de error formateado para el usuario
     """
-    error_type = error_info.get('error_type', 'Error')
-    message = error_info.get('message', 'Error desconocido')
-    
-    # Mensajes amigables para el usuario
-    user_messages = {
-        'AIProcessingError': 'Error en el procesamiento de IA. Inténtalo de nuevo.',
-        'ValidationError': 'Error de validación en los datos proporcionados.',
-        'DatabaseError': 'Error de conexión a la base de datos.',
-        'FileProcessingError': 'Error al procesar el archivo.',
-        'AIProcessingError': 'Error en el servicio de IA. Inténtalo más tarde.'
-    }
-    
-    return user_messages.get(error_type, f"Error: {message}")
+    user_message = _USER_MESSAGES.get(error_info.get('error_type', 'Error'))
+    if user_message is not None:
+        return user_message
+    return f"Error: {error_info.get('message', 'Error desconocido')}"
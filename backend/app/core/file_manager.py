@@ -1,20 +1,78 @@
 """
 Gestor de archivos para la aplicación.
 """
+from __future__ import annotations
+
+import asyncio
 import os
-import shutil
 import hashlib
 import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from collections.abc import Iterator
+from typing import Any, BinaryIO
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de bloque para el cálculo de hashes (1 MiB)
+HASH_CHUNK_SIZE = 1 << 20
+
+# Datos de trabajos: registro de actualizaciones (JSON Lines) sobre una instantánea
+# (job_data.json, que es también el formato de versiones anteriores)
+JOB_LOG_FILENAME = "job_data.jsonl"
+LEGACY_JOB_FILENAME = "job_data.json"
+# Serialización compacta: sin espacios ni sangría; UTF-8 sin escapes \uXXXX para el texto en español
+JOB_LOG_SEPARATORS = (',', ':')
+# Al superar este número de líneas, el registro se compacta en la instantánea
+JOB_LOG_COMPACT_LINES = 64
+
+# Locks por trabajo (repartidos en un número fijo para no crecer con cada trabajo)
+_JOB_LOCKS = tuple(threading.Lock() for _ in range(64))
+# Líneas de cada registro conocidas en este proceso; si falta una entrada se recuenta desde disco
+_job_log_lines: dict[str, int] = {}
+_JOB_LOG_LINES_MAX_ENTRIES = 1024
+
+def _job_lock(job_dir: Path) -> threading.Lock:
+    """Lock que serializa lecturas, escrituras y compactación del registro de un trabajo."""
+    return _JOB_LOCKS[hash(str(job_dir)) % len(_JOB_LOCKS)]
+
+# A partir de este número de archivos, los unlink de la limpieza se lanzan en paralelo
+PARALLEL_UNLINK_THRESHOLD = 32
+UNLINK_WORKERS = 8
+
+# Archivos subidos que se procesan a la vez dentro de un mismo trabajo
+UPLOAD_PROCESSING_CONCURRENCY = 4
+
+def _iter_files_recursive(directory: Path | str) -> Iterator[os.DirEntry]:
+    """
+    Recorrer recursivamente un directorio devolviendo las entradas de archivo.
+    
+    No sigue enlaces simbólicos y omite los directorios que desaparecen o no
+    se pueden leer durante el recorrido.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    yield from _iter_files_recursive(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+    except (PermissionError, FileNotFoundError) as e:
+        logger.debug("Directorio omitido en el recorrido %s: %s", directory, e)
+
 class FileManager:
     """Gestor de archivos del sistema."""
     
+    # Directorios base cuya estructura ya se creó en este proceso
+    _initialized_base_paths: set[str] = set()
+    
     def __init__(self, base_path: str = "."):
         """
         Inicializar el gestor de archivos.
@@ -23,7 +81,6 @@ class FileManager:
             base_path: Directorio base para archivos
         """
         self.base_path = Path(base_path)
-        self.base_path.mkdir(exist_ok=True)
         
         # Directorios específicos
         self.uploads_dir = self.base_path / "uploads"
@@ -31,62 +88,91 @@ class FileManager:
         self.reports_dir = self.base_path / "reports"
         self.analysis_dir = self.base_path / "analysis_results"
         
-        # Crear directorios si no existen
-        for directory in [self.uploads_dir, self.temp_dir, self.reports_dir, self.analysis_dir]:
-            directory.mkdir(exist_ok=True)
+        # Crear directorios si no existen (solo la primera vez por directorio base)
+        base_key = os.path.abspath(self.base_path)
+        if base_key not in FileManager._initialized_base_paths:
+            self.base_path.mkdir(exist_ok=True)
+            for directory in [self.uploads_dir, self.temp_dir, self.reports_dir, self.analysis_dir]:
+                directory.mkdir(exist_ok=True)
+            FileManager._initialized_base_paths.add(base_key)
     
-    def save_file(self, file_content: bytes, filename: str, subdirectory: str = "uploads") -> Dict[str, Any]:
+    def save_file(self, file_content: bytes | BinaryIO, filename: str,
+                  subdirectory: str = "uploads") -> dict[str, Any]:
         """
         Guardar un archivo en el sistema.
         
         Args:
-            file_content: Contenido del archivo
-            filename: Nombre del archivo
+            file_content: Contenido del archivo (bytes) o archivo binario abierto,
+                que se copia por bloques sin cargarlo entero en memoria
+            filename: Nombre original del archivo (se conserva su extensión)
             subdirectory: Subdirectorio donde guardar
             
         Returns:
-            Información del archivo guardado
+            Información del archivo guardado; el nombre en disco es el hash
+            SHA-256 del contenido, por lo que las subidas idénticas se deduplican
         """
         try:
             # Determinar directorio de destino
             target_dir = self.base_path / subdirectory
             target_dir.mkdir(exist_ok=True)
             
-            # Generar nombre único si el archivo ya existe
-            file_path = target_dir / filename
-            counter = 1
-            while file_path.exists():
-                name, ext = os.path.splitext(filename)
-                file_path = target_dir / f"{name}_{counter}{ext}"
-                counter += 1
-            
-            # Guardar archivo
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            
-            # Calcular hash del archivo
-            file_hash = self._calculate_file_hash(file_path)
+            # Almacenamiento direccionado por contenido: el archivo se guarda como
+            # <hash><ext>; si ya existe, el contenido es idéntico y no se reescribe
+            ext = os.path.splitext(filename)[1]
+            
+            # El contenido se escribe en un archivo temporal del mismo directorio y solo se
+            # renombra a su nombre definitivo una vez completo: un fallo a mitad de escritura
+            # nunca deja un archivo truncado bajo el nombre del hash
+            hash_sha256 = hashlib.sha256()
+            fd, tmp_name = tempfile.mkstemp(dir=target_dir, prefix=".upload_", suffix=ext)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    if isinstance(file_content, (bytes, bytearray, memoryview)):
+                        hash_sha256.update(file_content)
+                        f.write(file_content)
+                    else:
+                        # Flujo: se copia por bloques sin cargarlo entero en memoria
+                        for chunk in iter(lambda: file_content.read(HASH_CHUNK_SIZE), b""):
+                            hash_sha256.update(chunk)
+                            f.write(chunk)
+                    size = f.tell()
+                file_hash = hash_sha256.hexdigest()
+                file_path = target_dir / f"{file_hash}{ext}"
+                deduplicated = file_path.exists()
+                if deduplicated:
+                    os.unlink(tmp_name)
+                else:
+                    os.chmod(tmp_name, 0o644)
+                    os.replace(tmp_name, file_path)
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                raise
             
             # Información del archivo
             file_info = {
                 "filename": file_path.name,
+                "original_filename": filename,
                 "path": str(file_path),
-                "size": file_path.stat().st_size,
+                "size": size,
                 "hash": file_hash,
+                "deduplicated": deduplicated,
                 "subdirectory": subdirectory
             }
             
-            logger.info(f"Archivo guardado: {file_path}")
+            logger.debug("Archivo guardado: %s", file_path)
             return file_info
             
         except Exception as e:
-            logger.error(f"Error guardando archivo {filename}: {e}")
+            logger.error("Error guardando archivo %s: %s", filename, e)
             raise
     
-    def get_file(self, file_path: str) -> Optional[bytes]:
+    def get_file(self, file_path: str) -> bytes | None:
         """
         Obtener contenido de un archivo.
         
+        Carga el archivo completo en memoria; para archivos grandes usar iter_file.
+        
         Args:
             file_path: Ruta del archivo
             
@@ -100,9 +186,61 @@ class FileManager:
                     return f.read()
             return None
         except Exception as e:
-            logger.error(f"Error obteniendo archivo {file_path}: {e}")
+            logger.error("Error obteniendo archivo %s: %s", file_path, e)
             return None
     
+    def iter_file(self, file_path: str, chunk_size: int = HASH_CHUNK_SIZE) -> Iterator[bytes]:
+        """
+        Leer un archivo por bloques, sin cargarlo entero en memoria.
+        
+        Preferible a get_file para archivos grandes; el iterador puede pasarse
+        directamente a un StreamingResponse. Para servir un archivo completo por
+        HTTP, FileResponse(path) evita además la copia en Python (sendfile).
+        
+        Args:
+            file_path: Ruta del archivo
+            chunk_size: Tamaño de cada bloque en bytes
+            
+        Yields:
+            Bloques consecutivos del archivo (nada si no existe)
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.error("Error leyendo archivo %s: %s", file_path, e)
+    
+    async def asave_file(self, file_content: bytes | BinaryIO, filename: str,
+                         subdirectory: str = "uploads") -> dict[str, Any]:
+        """
+        Versión asíncrona de save_file: la E/S de disco se ejecuta en un hilo
+        para no bloquear el bucle de eventos.
+        
+        Args:
+            file_content: Contenido del archivo (bytes) o archivo binario abierto
+            filename: Nombre del archivo
+            subdirectory: Subdirectorio donde guardar
+            
+        Returns:
+            Información del archivo guardado
+        """
+        return await asyncio.to_thread(self.save_file, file_content, filename, subdirectory)
+    
+    async def aget_file(self, file_path: str) -> bytes | None:
+        """
+        Versión asíncrona de get_file: la lectura se ejecuta en un hilo.
+        
+        Args:
+            file_path: Ruta del archivo
+            
+        Returns:
+            Contenido del archivo o None si no existe
+        """
+        return await asyncio.to_thread(self.get_file, file_path)
+    
     def delete_file(self, file_path: str) -> bool:
         """
         Eliminar un archivo.
@@ -117,14 +255,14 @@ class FileManager:
             path = Path(file_path)
             if path.exists():
                 path.unlink()
-                logger.info(f"Archivo eliminado: {file_path}")
+                logger.info("Archivo eliminado: %s", file_path)
                 return True
             return False
         except Exception as e:
-            logger.error(f"Error eliminando archivo {file_path}: {e}")
+            logger.error("Error eliminando archivo %s: %s", file_path, e)
             return False
     
-    def list_files(self, subdirectory: str = "uploads") -> List[Dict[str, Any]]:
+    def list_files(self, subdirectory: str = "uploads") -> list[dict[str, Any]]:
         """
         Listar archivos en un subdirectorio.
         
@@ -140,18 +278,20 @@ class FileManager:
                 return []
             
             files = []
-            for file_path in target_dir.iterdir():
-                if file_path.is_file():
-                    files.append({
-                        "filename": file_path.name,
-                        "path": str(file_path),
-                        "size": file_path.stat().st_size,
-                        "modified": file_path.stat().st_mtime
-                    })
+            with os.scandir(target_dir) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        stat_result = entry.stat()
+                        files.append({
+                            "filename": entry.name,
+                            "path": entry.path,
+                            "size": stat_result.st_size,
+                            "modified": stat_result.st_mtime
+                        })
             
             return files
         except Exception as e:
-            logger.error(f"Error listando archivos en {subdirectory}: {e}")
+            logger.error("Error listando archivos en %s: %s", subdirectory, e)
             return []
     
     def cleanup_temp_files(self, max_age_hours: int = 24) -> int:
@@ -165,35 +305,42 @@ class FileManager:
             Número de archivos eliminados
         """
         try:
-            import time
-            current_time = time.time()
-            max_age_seconds = max_age_hours * 3600
-            
-            deleted_count = 0
-            for file_path in self.temp_dir.iterdir():
-                if file_path.is_file():
-                    file_age = current_time - file_path.stat().st_mtime
-                    if file_age > max_age_seconds:
-                        file_path.unlink()
-                        deleted_count += 1
-                        logger.info(f"Archivo temporal eliminado: {file_path}")
-            
-            logger.info(f"Limpieza completada: {deleted_count} archivos eliminados")
+            # Un único barrido con un instante de corte fijo (equivalente a find -mtime +N)
+            cutoff = time.time() - max_age_hours * 3600
+            
+            with os.scandir(self.temp_dir) as entries:
+                expired_paths = [
+                    entry.path for entry in entries
+                    if entry.is_file() and entry.stat().st_mtime < cutoff
+                ]
+            
+            # Eliminar en lote: con muchos archivos los unlink bloqueantes se solapan en un pool
+            if len(expired_paths) >= PARALLEL_UNLINK_THRESHOLD:
+                with ThreadPoolExecutor(max_workers=UNLINK_WORKERS) as executor:
+                    deleted_count = sum(executor.map(self._unlink_temp_file, expired_paths))
+            else:
+                deleted_count = sum(map(self._unlink_temp_file, expired_paths))
+            
+            logger.info("Limpieza completada: %s archivos eliminados", deleted_count)
             return deleted_count
             
         except Exception as e:
-            logger.error(f"Error en limpieza de archivos temporales: {e}")
+            logger.error("Error en limpieza de archivos temporales: %s", e)
             return 0
     
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calcular hash MD5 de un archivo."""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+    def _unlink_temp_file(self, path: str) -> bool:
+        """Eliminar un archivo temporal; devuelve True si se eliminó."""
+        try:
+            os.unlink(path)
+            return True
+        except FileNotFoundError:
+            # Ya eliminado por otro proceso
+            return False
+        except OSError as e:
+            logger.error("Error eliminando archivo temporal %s: %s", path, e)
+            return False
     
-    def get_storage_info(self) -> Dict[str, Any]:
+    def get_storage_info(self) -> dict[str, Any]:
         """
         Obtener información del almacenamiento.
         
@@ -206,10 +353,9 @@ class FileManager:
             
             for directory in [self.uploads_dir, self.temp_dir, self.reports_dir, self.analysis_dir]:
                 if directory.exists():
-                    for file_path in directory.rglob('*'):
-                        if file_path.is_file():
-                            total_size += file_path.stat().st_size
-                            file_count += 1
+                    for entry in _iter_files_recursive(directory):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                        file_count += 1
             
             return {
                 "total_size_bytes": total_size,
@@ -223,10 +369,10 @@ class FileManager:
                 }
             }
         except Exception as e:
-            logger.error(f"Error obteniendo información de almacenamiento: {e}")
+            logger.error("Error obteniendo información de almacenamiento: %s", e)
             return {}
     
-    async def process_uploaded_files(self, files: List[Any], job_id: str, is_existing_building: bool) -> Dict[str, Any]:
+    async def process_uploaded_files(self, files: list[Any], job_id: str, is_existing_building: bool) -> dict[str, Any]:
         """
         Procesar archivos subidos con clasificación automática.
         
@@ -239,7 +385,7 @@ class FileManager:
             Datos extraídos de los archivos
         """
         try:
-            logger.info(f"Procesando {len(files)} archivos para trabajo {job_id}")
+            logger.info("Procesando %s archivos para trabajo %s", len(files), job_id)
             
             # Crear directorio del trabajo
             job_dir = self.temp_dir / job_id
@@ -251,34 +397,41 @@ class FileManager:
             from .document_analyzer import DocumentAnalyzer
             from .ai_client import AIClient
             
-            # Inicializar procesadores
-            pdf_processor = PDFProcessor()
+            # Inicializar procesadores (el clasificador solo se usa desde el event loop)
             ai_client = AIClient()
             classifier = DocumentClassifier(ai_client)
-            analyzer = DocumentAnalyzer()
+            semaphore = asyncio.Semaphore(UPLOAD_PROCESSING_CONCURRENCY)
             
-            # Procesar archivos
-            processed_files = []
-            extracted_data = {}
+            async def _process_one(index: int, file: Any) -> dict[str, Any] | None:
+                async with semaphore:
+                    return await _process_file(index, file)
             
-            for file in files:
+            async def _process_file(index: int, file: Any) -> dict[str, Any] | None:
                 try:
-                    # Guardar archivo
-                    file_path = job_dir / file.filename
-                    with open(file_path, 'wb') as f:
-                        f.write(await file.read())
+                    # PDFProcessor y DocumentAnalyzer se ejecutan en hilos y no están pensados
+                    # para compartirse entre hilos: una instancia por archivo
+                    pdf_processor = PDFProcessor()
+                    analyzer = DocumentAnalyzer()
+                    
+                    # Guardar archivo copiándolo por bloques (sin cargarlo entero en memoria);
+                    # el clasificador y las fases posteriores necesitan una ruta en disco.
+                    # El prefijo con el índice evita que dos subidas con el mismo nombre
+                    # escriban en el mismo archivo
+                    file_path = job_dir / f"{index:03d}_{file.filename}"
+                    file_hash = await self._stream_upload_to_disk(file, file_path)
                     
-                    # Procesar PDF
-                    pdf_doc = pdf_processor.process_pdf(str(file_path))
+                    # Procesar PDF (reutilizando el hash calculado al copiar)
+                    pdf_doc = await asyncio.to_thread(pdf_processor.process_pdf, str(file_path), file_hash)
                     
                     # Clasificar documento
                     classification = await classifier.classify_document(str(file_path))
                     
                     # Analizar contenido
-                    content = analyzer.analyze_document(pdf_doc, classification)
+                    content = await asyncio.to_thread(analyzer.analyze_document, pdf_doc, classification)
+                    
+                    logger.info("Archivo procesado: %s - %s", file.filename, classification.document_type)
                     
-                    # Guardar resultados
-                    file_result = {
+                    return {
                         'filename': file.filename,
                         'file_path': str(file_path),
                         'classification': classification,
@@ -286,21 +439,33 @@ class FileManager:
                         'pdf_document': pdf_doc
                     }
                     
-                    processed_files.append(file_result)
-                    extracted_data[file.filename] = file_result
-                    
-                    logger.info(f"Archivo procesado: {file.filename} - {classification.document_type}")
-                    
                 except Exception as e:
-                    logger.error(f"Error procesando archivo {file.filename}: {e}")
+                    logger.error("Error procesando archivo %s: %s", file.filename, e)
+                    return None
+            
+            # Procesar archivos de forma concurrente, como máximo UPLOAD_PROCESSING_CONCURRENCY a la vez
+            # (escritura, PDF y clasificación con IA se solapan)
+            results = await asyncio.gather(*(_process_one(index, file) for index, file in enumerate(files)))
+            
+            # Una sola pasada: datos extraídos y agrupación por tipo de documento
+            extracted_data = {}
+            files_by_type = {'memoria': [], 'plano': []}
+            processed_count = 0
+            for file_result in results:
+                if file_result is None:
                     continue
+                processed_count += 1
+                extracted_data[file_result['filename']] = file_result
+                bucket = files_by_type.get(file_result['classification'].document_type)
+                if bucket is not None:
+                    bucket.append(file_result)
             
             # Crear resumen del procesamiento
             summary = {
                 'total_files': len(files),
-                'processed_files': len(processed_files),
-                'memoria_files': [f for f in processed_files if f['classification'].document_type == 'memoria'],
-                'plano_files': [f for f in processed_files if f['classification'].document_type == 'plano'],
+                'processed_files': processed_count,
+                'memoria_files': files_by_type['memoria'],
+                'plano_files': files_by_type['plano'],
                 'processing_complete': True,
                 'job_id': job_id,
                 'is_existing_building': is_existing_building
@@ -321,13 +486,54 @@ class FileManager:
             }
             
         except Exception as e:
-            logger.error(f"Error procesando archivos: {e}")
+            logger.error("Error procesando archivos: %s", e)
             raise
     
-    async def update_job_data(self, job_id: str, data: Dict[str, Any]) -> bool:
+    async def _stream_upload_to_disk(self, upload: Any, file_path: Path) -> str:
+        """
+        Copiar un archivo subido a disco en bloques de HASH_CHUNK_SIZE.
+        
+        El hash SHA-256 se calcula en la misma pasada, para no tener que volver
+        a leer el archivo desde disco.
+        
+        Args:
+            upload: Archivo subido (UploadFile de FastAPI u objeto con read() asíncrono)
+            file_path: Ruta de destino
+            
+        Returns:
+            Hash SHA-256 (hex) del contenido escrito
+        """
+        source = getattr(upload, 'file', None)
+        if source is not None:
+            # UploadFile.file es un SpooledTemporaryFile síncrono: copia completa en un hilo
+            return await asyncio.to_thread(self._copy_file_object, source, file_path)
+        
+        hash_sha256 = hashlib.sha256()
+        with open(file_path, 'wb') as out:
+            while chunk := await upload.read(HASH_CHUNK_SIZE):
+                hash_sha256.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        return hash_sha256.hexdigest()
+    
+    @staticmethod
+    def _copy_file_object(source: BinaryIO, file_path: Path) -> str:
+        """Copiar un archivo binario abierto a disco por bloques, devolviendo su hash SHA-256."""
+        source.seek(0)
+        hash_sha256 = hashlib.sha256()
+        with open(file_path, 'wb') as out:
+            while chunk := source.read(HASH_CHUNK_SIZE):
+                hash_sha256.update(chunk)
+                out.write(chunk)
+        return hash_sha256.hexdigest()
+    
+    async def update_job_data(self, job_id: str, data: dict[str, Any]) -> bool:
         """
         Actualizar datos de un trabajo.
         
+        Las actualizaciones se añaden como una línea JSON al registro del trabajo
+        (job_data.jsonl), sin releer ni reescribir los datos anteriores; cada
+        JOB_LOG_COMPACT_LINES líneas el registro se compacta en job_data.json.
+        
         Args:
             job_id: ID del trabajo
             data: Datos a actualizar
@@ -336,32 +542,26 @@ class FileManager:
             True si se actualizó correctamente
         """
         try:
-            job_file = self.temp_dir / job_id / 'job_data.json'
-            
-            # Cargar datos existentes
-            existing_data = {}
-            if job_file.exists():
-                with open(job_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
+            job_log = self.temp_dir / job_id / JOB_LOG_FILENAME
             
-            # Actualizar datos
-            existing_data.update(data)
-            existing_data['updated_at'] = datetime.now().isoformat()
-            
-            # Guardar datos actualizados
-            with open(job_file, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, indent=2, ensure_ascii=False)
+            # Añadir la actualización al registro; serialización y escritura en un hilo
+            record = dict(data)
+            record['updated_at'] = datetime.now().isoformat()
+            await asyncio.to_thread(self._append_job_record, job_log, record)
             
             return True
             
         except Exception as e:
-            logger.error(f"Error actualizando datos del trabajo {job_id}: {e}")
+            logger.error("Error actualizando datos del trabajo %s: %s", job_id, e)
             return False
     
-    async def get_job_data(self, job_id: str) -> Optional[Dict[str, Any]]:
+    async def get_job_data(self, job_id: str) -> dict[str, Any] | None:
         """
         Obtener datos de un trabajo.
         
+        Reconstruye el estado actual aplicando en orden las actualizaciones del
+        registro sobre la instantánea job_data.json, si existe.
+        
         Args:
             job_id: ID del trabajo
             
@@ -369,14 +569,101 @@ class FileManager:
             Datos del trabajo o None si no existe
         """
         try:
-            job_file = self.temp_dir / job_id / 'job_data.json'
-            
-            if not job_file.exists():
-                return None
-            
-            with open(job_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Lectura y parseo en un hilo para no bloquear el bucle de eventos
+            return await asyncio.to_thread(self._read_job_data, self.temp_dir / job_id)
                 
         except Exception as e:
-            logger.error(f"Error obteniendo datos del trabajo {job_id}: {e}")
-            return None
\ No newline at end of file
+            logger.error("Error obteniendo datos del trabajo %s: %s", job_id, e)
+            return None
+    
+    @staticmethod
+    def _append_job_record(job_log: Path, record: dict[str, Any]) -> None:
+        """
+        Añadir una actualización al registro del trabajo, compactándolo si crece demasiado.
+        
+        La línea se escribe con os.write sobre un descriptor O_APPEND (sin búfer de
+        texto que la parta en varias escrituras) y bajo el lock del trabajo, de modo
+        que dos actualizaciones solapadas no se intercalan.
+        """
+        line = (json.dumps(record, separators=JOB_LOG_SEPARATORS, ensure_ascii=False) + '\n').encode('utf-8')
+        job_dir = job_log.parent
+        key = str(job_log)
+        
+        with _job_lock(job_dir):
+            fd = os.open(job_log, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                view = memoryview(line)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
+            
+            line_count = _job_log_lines.get(key)
+            if line_count is None:
+                with open(job_log, 'rb') as f:
+                    line_count = sum(1 for _ in f)
+            else:
+                line_count += 1
+            
+            if line_count > JOB_LOG_COMPACT_LINES:
+                FileManager._compact_job_log(job_dir)
+                _job_log_lines.pop(key, None)
+            else:
+                if len(_job_log_lines) >= _JOB_LOG_LINES_MAX_ENTRIES:
+                    _job_log_lines.clear()
+                _job_log_lines[key] = line_count
+    
+    @staticmethod
+    def _compact_job_log(job_dir: Path) -> None:
+        """Volcar el estado actual a la instantánea y vaciar el registro (con el lock del trabajo)."""
+        job_data = FileManager._merge_job_data(job_dir)
+        if job_data is None:
+            return
+        
+        # La instantánea se reemplaza de forma atómica antes de borrar el registro; si el
+        # proceso se detiene entre ambos pasos, volver a aplicar el registro da el mismo estado
+        fd, tmp_name = tempfile.mkstemp(dir=job_dir, prefix=".job_data_", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(job_data, f, separators=JOB_LOG_SEPARATORS, ensure_ascii=False)
+            os.replace(tmp_name, job_dir / LEGACY_JOB_FILENAME)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        os.unlink(job_dir / JOB_LOG_FILENAME)
+    
+    @staticmethod
+    def _read_job_data(job_dir: Path) -> dict[str, Any] | None:
+        """Reconstruir los datos de un trabajo desde disco (None si no existen)."""
+        with _job_lock(job_dir):
+            return FileManager._merge_job_data(job_dir)
+    
+    @staticmethod
+    def _merge_job_data(job_dir: Path) -> dict[str, Any] | None:
+        """Aplicar en orden las líneas del registro sobre la instantánea del trabajo."""
+        legacy_file = job_dir / LEGACY_JOB_FILENAME
+        job_log = job_dir / JOB_LOG_FILENAME
+        
+        if not job_log.exists() and not legacy_file.exists():
+            return None
+        
+        job_data: dict[str, Any] = {}
+        if legacy_file.exists():
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                job_data = json.load(f)
+        
+        if job_log.exists():
+            with open(job_log, 'r', encoding='utf-8') as f:
+                lines = [line for line in f if line.strip()]
+            
+            for index, line in enumerate(lines):
+                try:
+                    job_data.update(json.loads(line))
+                except json.JSONDecodeError:
+                    # Una última línea incompleta (escritura interrumpida) no invalida el trabajo
+                    if index != len(lines) - 1:
+                        raise
+                    logger.warning("Ignorando última línea incompleta en %s", job_log)
+        
+        return job_data
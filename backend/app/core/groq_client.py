@@ -25,6 +25,10 @@ logger = logging.getLogger(__name__)
 class GroqClient:
     """Cliente Groq con rotación automática de claves y manejo de rate limits."""
     
+    # Sesión HTTP compartida por todas las instancias (reutiliza conexiones TCP/TLS)
+    _shared_session: Optional[aiohttp.ClientSession] = None
+    _shared_session_loop: Optional[asyncio.AbstractEventLoop] = None
+    
     def __init__(self, config: AIConfig):
         """Inicializar cliente Groq."""
         self.config = config
@@ -39,43 +43,79 @@ class GroqClient:
         self.error_count = 0
         self.last_request_time = None
         self.key_errors = {key: 0 for key in config.groq_api_keys}
+        # Instante (monotónico) hasta el que cada clave está limitada por rate limit
+        self._key_cooldown: Dict[str, float] = {}
+        
+        # Headers precalculados por clave (se reutilizan en cada petición)
+        self._headers_by_key = {key: self._build_headers(key) for key in config.groq_api_keys}
         
         logger.info(f"GroqClient initialized with {len(config.groq_api_keys)} keys")
     
+    @classmethod
+    def _get_session(cls, num_keys: int) -> aiohttp.ClientSession:
+        """Obtener la sesión HTTP compartida, creándola si no existe para el bucle actual."""
+        loop = asyncio.get_running_loop()
+        session = cls._shared_session
+        if session is None or session.closed or cls._shared_session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=max(num_keys, 1) * 4,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                enable_cleanup_closed=True
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                headers={
+                    "Content-Type": "application/json",
+                    "User-Agent": "BuildingVerificationSystem/1.0"
+                }
+            )
+            cls._shared_session = session
+            cls._shared_session_loop = loop
+        return session
+    
+    @classmethod
+    async def close_shared_session(cls):
+        """Cerrar la sesión HTTP compartida (al apagar la aplicación)."""
+        session = cls._shared_session
+        cls._shared_session = None
+        cls._shared_session_loop = None
+        if session is not None and not session.closed:
+            await session.close()
+    
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.timeout),
-            headers={
-                "Content-Type": "application/json",
-                "User-Agent": "BuildingVerificationSystem/1.0"
-            }
-        )
+        self.session = self._get_session(len(self.config.groq_api_keys))
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit."""
-        if self.session:
-            await self.session.close()
+        """Async context manager exit (la sesión compartida sigue abierta)."""
+        self.session = None
+    
+    @staticmethod
+    def _build_headers(api_key: str) -> Dict[str, str]:
+        """Construir headers para una clave (Content-Type y User-Agent van en la sesión)."""
+        return {"Authorization": f"Bearer {api_key}"}
     
     def _get_headers(self, api_key: str) -> Dict[str, str]:
         """Obtener headers para la petición."""
-        return {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json",
-            "User-Agent": "BuildingVerificationSystem/1.0"
-        }
+        headers = self._headers_by_key.get(api_key)
+        if headers is None:
+            headers = self._headers_by_key[api_key] = self._build_headers(api_key)
+        return headers
     
     async def _make_request(self, 
                           endpoint: str, 
-                          payload: Dict[str, Any], 
+                          body: bytes, 
                           api_key: str) -> Tuple[bool, Dict[str, Any], Optional[str]]:
-        """Realizar petición HTTP a Groq API."""
+        """Realizar petición HTTP a Groq API con el cuerpo JSON ya serializado."""
         try:
             url = f"{self.base_url}/{endpoint}"
             headers = self._get_headers(api_key)
             
-            async with self.session.post(url, json=payload, headers=headers) as response:
+            async with self.session.post(url, data=body, headers=headers,
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout)) as response:
                 self.request_count += 1
                 self.last_request_time = datetime.now()
                 
@@ -87,6 +127,7 @@ class GroqClient:
                     return True, data, None
                 elif response.status == 429:  # Rate limit
                     retry_after = int(response.headers.get('Retry-After', 1))
+                    self._key_cooldown[api_key] = time.monotonic() + retry_after
                     error_msg = f"Rate limit exceeded. Retry after {retry_after} seconds"
                     logger.warning(f"Rate limit for key {api_key[:10]}...: {error_msg}")
                     return False, {}, error_msg
@@ -110,33 +151,53 @@ class GroqClient:
             logger.error(error_msg)
             return False, {}, error_msg
     
+    def _next_available_key(self) -> Tuple[str, float]:
+        """
+        Obtener la primera clave que no esté limitada, rotando desde la actual.
+        
+        Returns:
+            Tupla (clave, segundos de espera); la espera solo es positiva si todas
+            las claves están limitadas, en cuyo caso se devuelve la que se libera antes
+        """
+        now = time.monotonic()
+        key = self.config.get_current_key()
+        limited_until = self._key_cooldown.get(key, 0.0)
+        if limited_until <= now:
+            return key, 0.0
+        
+        best_key, best_until = key, limited_until
+        for _ in range(len(self.config.groq_api_keys) - 1):
+            key = self.config.rotate_key()
+            limited_until = self._key_cooldown.get(key, 0.0)
+            if limited_until <= now:
+                return key, 0.0
+            if limited_until < best_until:
+                best_key, best_until = key, limited_until
+        
+        return best_key, best_until - now
+    
     async def _try_with_key_rotation(self, 
                                    endpoint: str, 
-                                   payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any], Optional[str]]:
-        """Intentar petición con rotación de claves."""
+                                   payload: Dict[str, Any]) -> Tuple[bool, Dict[str, Any], Optional[str], Optional[str]]:
+        """Intentar petición con rotación de claves; devuelve también la clave usada."""
         last_error = None
+        # El payload se serializa una sola vez y se reutiliza en todos los reintentos
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
         
         for attempt in range(self.max_retries):
-            # Obtener clave actual
-            current_key = self.config.get_current_key()
+            # Elegir una clave fuera de su periodo de rate limit (una sola vez por intento)
+            current_key, wait_time = self._next_available_key()
+            
+            # Solo se espera si todas las claves siguen limitadas
+            if wait_time > 0:
+                logger.info(f"Waiting {wait_time:.1f} seconds before retry...")
+                await asyncio.sleep(wait_time)
             
             # Realizar petición
-            success, data, error = await self._make_request(endpoint, payload, current_key)
+            success, data, error = await self._make_request(endpoint, body, current_key)
             
             if success:
-                return True, data, None
-            
-            # Si es error de rate limit, esperar antes de rotar
-            if "Rate limit" in str(error):
-                retry_after = 1
-                if "Retry after" in str(error):
-                    try:
-                        retry_after = int(str(error).split("Retry after ")[1].split(" ")[0])
-                    except:
-                        retry_after = 1
-                
-                logger.info(f"Waiting {retry_after} seconds before retry...")
-                await asyncio.sleep(retry_after)
+                return True, data, None, current_key
             
             # Rotar clave para el siguiente intento
             if attempt < self.max_retries - 1:
@@ -150,7 +211,7 @@ class GroqClient:
         
         # Si llegamos aquí, todos los intentos fallaron
         self.error_count += 1
-        return False, {}, f"All attempts failed. Last error: {last_error}"
+        return False, {}, f"All attempts failed. Last error: {last_error}", None
     
     async def generate_completion(self, 
                                 prompt: str, 
@@ -164,7 +225,8 @@ class GroqClient:
         # Usar configuración por defecto si no se especifica
         model = model or self.config.groq_model
         max_tokens = max_tokens or self.config.max_tokens
-        temperature = temperature or self.config.temperature
+        if temperature is None:
+            temperature = self.config.temperature
         
         payload = {
             "model": model,
@@ -181,7 +243,7 @@ class GroqClient:
         
         logger.info(f"Generating completion with model {model}, max_tokens {max_tokens}")
         
-        success, data, error = await self._try_with_key_rotation("chat/completions", payload)
+        success, data, error, used_key = await self._try_with_key_rotation("chat/completions", payload)
         
         if success:
             return {
@@ -189,7 +251,7 @@ class GroqClient:
                 "response": data.get("choices", [{}])[0].get("message", {}).get("content", ""),
                 "usage": data.get("usage", {}),
                 "model": data.get("model", model),
-                "key_used": self.config.get_current_key()[:10] + "..."
+                "key_used": used_key[:10] + "..."
             }
         else:
             return {
@@ -212,7 +274,8 @@ class GroqClient:
         # Usar configuración por defecto si no se especifica
         model = model or self.config.groq_model
         max_tokens = max_tokens or self.config.max_tokens
-        temperature = temperature or self.config.temperature
+        if temperature is None:
+            temperature = self.config.temperature
         
         # Añadir instrucciones para JSON
         json_prompt = f"{prompt}\n\nResponde ÚNICAMENTE en formato JSON válido, sin texto adicional."
@@ -233,7 +296,7 @@ class GroqClient:
         
         logger.info(f"Generating structured completion with model {model}")
         
-        success, data, error = await self._try_with_key_rotation("chat/completions", payload)
+        success, data, error, used_key = await self._try_with_key_rotation("chat/completions", payload)
         
         if success:
             response_text = data.get("choices", [{}])[0].get("message", {}).get("content", "")
@@ -247,7 +310,7 @@ class GroqClient:
                     "raw_response": response_text,
                     "usage": data.get("usage", {}),
                     "model": data.get("model", model),
-                    "key_used": self.config.get_current_key()[:10] + "..."
+                    "key_used": used_key[:10] + "..."
                 }
             except json.JSONDecodeError as e:
                 logger.warning(f"Failed to parse JSON response: {e}")
@@ -3,6 +3,11 @@ Prompts optimizados específicamente para Groq API (Llama 3.3 70B).
 Diseñados para máxima eficiencia y precisión con el modelo de Groq.
 """
 
+import re
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Optional
+
 # =============================================================================
 # PROMPTS OPTIMIZADOS PARA GROQ API
 # =============================================================================
@@ -16,163 +21,163 @@ Usa el siguiente formato exacto:"""
 # EXTRACCIÓN DE DATOS ESTRUCTURADA
 # =============================================================================
 
-GROQ_PROJECT_DATA_EXTRACTION = f"""{GROQ_BASE_PROMPT}
-{{
-  "project_info": {{
+GROQ_PROJECT_DATA_EXTRACTION = GROQ_BASE_PROMPT + """
+{
+  "project_info": {
     "building_type": "string",
     "total_area": "number",
     "floors": "number",
     "height": "number",
     "location": "string"
-  }},
-  "structural_data": {{
+  },
+  "structural_data": {
     "system": "string",
     "materials": "array",
     "fire_resistance": "object"
-  }},
-  "compliance_issues": {{
+  },
+  "compliance_issues": {
     "db_si": "array",
     "db_sua": "array", 
     "db_he": "array",
     "db_hr": "array"
-  }}
-}}
+  }
+}
 
-DOCUMENTOS: {{project_text}}"""
+DOCUMENTOS: {project_text}"""
 
 # =============================================================================
 # ANÁLISIS DE CUMPLIMIENTO NORMATIVO
 # =============================================================================
 
-GROQ_COMPLIANCE_ANALYSIS = f"""{GROQ_BASE_PROMPT}
-{{
-  "compliance_summary": {{
+GROQ_COMPLIANCE_ANALYSIS = GROQ_BASE_PROMPT + """
+{
+  "compliance_summary": {
     "overall_score": "number",
     "critical_issues": "number",
     "minor_issues": "number"
-  }},
-  "db_si_analysis": {{
+  },
+  "db_si_analysis": {
     "evacuation_routes": "object",
     "fire_resistance": "object",
     "smoke_control": "object"
-  }},
-  "db_sua_analysis": {{
+  },
+  "db_sua_analysis": {
     "accessibility": "object",
     "safety_measures": "object",
     "structural_safety": "object"
-  }},
+  },
   "recommendations": "array"
-}}
+}
 
-DATOS DEL PROYECTO: {{project_data}}"""
+DATOS DEL PROYECTO: {project_data}"""
 
 # =============================================================================
 # DETECCIÓN DE CONTRADICCIONES
 # =============================================================================
 
-GROQ_CONTRADICTION_DETECTION = f"""{GROQ_BASE_PROMPT}
-{{
+GROQ_CONTRADICTION_DETECTION = GROQ_BASE_PROMPT + """
+{
   "contradictions": [
-    {{
+    {
       "type": "string",
       "description": "string",
       "severity": "string",
       "documents_involved": "array",
       "resolution": "string"
-    }}
+    }
   ],
-  "data_consistency": {{
+  "data_consistency": {
     "memory_plans_match": "boolean",
     "calculations_consistent": "boolean",
     "specifications_complete": "boolean"
-  }}
-}}
+  }
+}
 
-MEMORIA: {{memory_text}}
-PLANOS: {{plans_text}}"""
+MEMORIA: {memory_text}
+PLANOS: {plans_text}"""
 
 # =============================================================================
 # CLASIFICACIÓN DE ELEMENTOS ARQUITECTÓNICOS
 # =============================================================================
 
-GROQ_ARCHITECTURAL_CLASSIFICATION = f"""{GROQ_BASE_PROMPT}
-{{
+GROQ_ARCHITECTURAL_CLASSIFICATION = GROQ_BASE_PROMPT + """
+{
   "elements": [
-    {{
+    {
       "type": "string",
       "confidence": "number",
       "dimensions": "object",
       "properties": "object"
-    }}
+    }
   ],
   "rooms": [
-    {{
+    {
       "type": "string",
       "area": "number",
       "accessibility": "boolean"
-    }}
+    }
   ]
-}}
+}
 
-ELEMENTOS DETECTADOS: {{elements_data}}"""
+ELEMENTOS DETECTADOS: {elements_data}"""
 
 # =============================================================================
 # GENERACIÓN DE PREGUNTAS INTELIGENTES
 # =============================================================================
 
-GROQ_QUESTION_GENERATION = f"""{GROQ_BASE_PROMPT}
-{{
+GROQ_QUESTION_GENERATION = GROQ_BASE_PROMPT + """
+{
   "questions": [
-    {{
+    {
       "id": "string",
       "question": "string",
       "context": "string",
       "priority": "string",
       "expected_answer_type": "string"
-    }}
+    }
   ],
   "ambiguities": [
-    {{
+    {
       "description": "string",
       "impact": "string",
       "resolution_options": "array"
-    }}
+    }
   ]
-}}
+}
 
-ANÁLISIS PREVIO: {{analysis_data}}"""
+ANÁLISIS PREVIO: {analysis_data}"""
 
 # =============================================================================
 # ANÁLISIS DE PLANOS CON VISIÓN POR COMPUTADOR
 # =============================================================================
 
-GROQ_PLAN_ANALYSIS = f"""{GROQ_BASE_PROMPT}
-{{
+GROQ_PLAN_ANALYSIS = GROQ_BASE_PROMPT + """
+{
   "detected_elements": [
-    {{
+    {
       "element_type": "string",
       "coordinates": "array",
       "confidence": "number",
       "dimensions": "object"
-    }}
+    }
   ],
   "room_analysis": [
-    {{
+    {
       "room_id": "string",
       "room_type": "string",
       "area": "number",
       "accessibility_features": "array"
-    }}
+    }
   ],
-  "compliance_check": {{
+  "compliance_check": {
     "door_widths": "array",
     "evacuation_distances": "array",
     "accessibility_issues": "array"
-  }}
-}}
+  }
+}
 
-ELEMENTOS DETECTADOS: {{cv_elements}}
-CONTEXTO: {{plan_context}}"""
+ELEMENTOS DETECTADOS: {cv_elements}
+CONTEXTO: {plan_context}"""
 
 # =============================================================================
 # OPTIMIZACIÓN DE RENDIMIENTO
@@ -186,18 +191,18 @@ GROQ_QUICK_VALIDATION = """Valida: {data}
 Respuesta: {{"valid": "boolean", "issues": "array"}}"""
 
 # Prompts para análisis en lotes
-GROQ_BATCH_ANALYSIS = f"""{GROQ_BASE_PROMPT}
-{{
+GROQ_BATCH_ANALYSIS = GROQ_BASE_PROMPT + """
+{
   "results": [
-    {{
+    {
       "item_id": "string",
       "analysis": "object",
       "confidence": "number"
-    }}
+    }
   ]
-}}
+}
 
-ITEMS: {{batch_data}}"""
+ITEMS: {batch_data}"""
 
 # =============================================================================
 # CONFIGURACIÓN ESPECÍFICA PARA GROQ
@@ -215,8 +220,9 @@ GROQ_MODEL_CONFIG = {
 # Configuración para diferentes tipos de análisis
 GROQ_ANALYSIS_CONFIGS = {
     "quick": {
+        "model": "llama-3.1-8b-instant",  # Modelo ligero para clasificaciones y validaciones cortas
         "temperature": 0.0,
-        "max_tokens": 512,
+        "max_tokens": 48,
         "timeout": 10
     },
     "detailed": {
@@ -235,120 +241,207 @@ GROQ_ANALYSIS_CONFIGS = {
 # UTILIDADES PARA OPTIMIZACIÓN
 # =============================================================================
 
+# Huecos de las plantillas: llaves escapadas ({{ / }}) o un campo simple ({nombre})
+_TEMPLATE_TOKEN_RE = re.compile(r'(\{\{|\}\}|\{\w+\})')
+
+def _compile_template(template: str) -> tuple:
+    """
+    Pre-analiza una plantilla en partes (literal, campo).
+    
+    Solo se consideran campos los huecos {nombre}; el resto de llaves se
+    conserva literalmente, ya que las plantillas que concatenan GROQ_BASE_PROMPT
+    contienen el esquema JSON con llaves simples.
+    """
+    parts = []
+    literal = ''
+    for token in _TEMPLATE_TOKEN_RE.split(template):
+        if token == '{{' or token == '}}':
+            literal += token[0]
+        elif _TEMPLATE_TOKEN_RE.fullmatch(token):
+            parts.append((literal, token[1:-1]))
+            literal = ''
+        else:
+            literal += token
+    parts.append((literal, None))
+    return tuple(parts)
+
+def _render_template(parts: tuple, **fields) -> str:
+    """Renderiza una plantilla pre-analizada sin volver a escanear sus llaves."""
+    return ''.join(
+        literal if field_name is None else literal + str(fields[field_name])
+        for literal, field_name in parts
+    )
+
+# Plantillas por tipo de prompt
+_OPTIMIZED_PROMPTS = {
+    "project_data": GROQ_PROJECT_DATA_EXTRACTION,
+    "compliance": GROQ_COMPLIANCE_ANALYSIS,
+    "contradictions": GROQ_CONTRADICTION_DETECTION,
+    "classification": GROQ_ARCHITECTURAL_CLASSIFICATION,
+    "questions": GROQ_QUESTION_GENERATION,
+    "plan_analysis": GROQ_PLAN_ANALYSIS,
+    "quick_classification": GROQ_QUICK_CLASSIFICATION,
+    "quick_validation": GROQ_QUICK_VALIDATION,
+    "batch_analysis": GROQ_BATCH_ANALYSIS
+}
+
+# Plantillas analizadas una sola vez al importar el módulo
+_OPTIMIZED_PROMPT_PARTS = {
+    prompt_type: _compile_template(template)
+    for prompt_type, template in _OPTIMIZED_PROMPTS.items()
+}
+_BASE_PROMPT_PARTS = _compile_template(GROQ_BASE_PROMPT)
+
+@lru_cache(maxsize=128)
+def _render_optimized_prompt(prompt_type: str, items: tuple) -> str:
+    """Renderiza (y memoriza) un prompt para una combinación de argumentos hashables."""
+    parts = _OPTIMIZED_PROMPT_PARTS.get(prompt_type, _BASE_PROMPT_PARTS)
+    return _render_template(parts, **dict(items))
+
 def get_optimized_prompt(prompt_type: str, **kwargs) -> str:
     """Obtiene un prompt optimizado para Groq basado en el tipo."""
-    prompts = {
-        "project_data": GROQ_PROJECT_DATA_EXTRACTION,
-        "compliance": GROQ_COMPLIANCE_ANALYSIS,
-        "contradictions": GROQ_CONTRADICTION_DETECTION,
-        "classification": GROQ_ARCHITECTURAL_CLASSIFICATION,
-        "questions": GROQ_QUESTION_GENERATION,
-        "plan_analysis": GROQ_PLAN_ANALYSIS,
-        "quick_classification": GROQ_QUICK_CLASSIFICATION,
-        "quick_validation": GROQ_QUICK_VALIDATION,
-        "batch_analysis": GROQ_BATCH_ANALYSIS
-    }
-    
-    base_prompt = prompts.get(prompt_type, GROQ_BASE_PROMPT)
-    return base_prompt.format(**kwargs)
+    items = tuple(sorted(kwargs.items()))
+    try:
+        hash(items)
+    except TypeError:
+        # Argumentos no hashables (p. ej. dicts): se renderiza sin caché
+        parts = _OPTIMIZED_PROMPT_PARTS.get(prompt_type, _BASE_PROMPT_PARTS)
+        return _render_template(parts, **kwargs)
+    return _render_optimized_prompt(prompt_type, items)
+
+# Configuraciones ya combinadas por tipo de análisis (calculadas una sola vez)
+_MERGED_GROQ_CONFIGS = {
+    analysis_type: {**GROQ_MODEL_CONFIG, **analysis_config}
+    for analysis_type, analysis_config in GROQ_ANALYSIS_CONFIGS.items()
+}
 
-def get_groq_config(analysis_type: str = "detailed") -> dict:
-    """Obtiene la configuración optimizada para Groq."""
-    config = GROQ_MODEL_CONFIG.copy()
-    config.update(GROQ_ANALYSIS_CONFIGS.get(analysis_type, {}))
-    return config
+# Vistas de solo lectura sobre las configuraciones combinadas
+_GROQ_CONFIG_VIEWS = {
+    analysis_type: MappingProxyType(config)
+    for analysis_type, config in _MERGED_GROQ_CONFIGS.items()
+}
+_DEFAULT_GROQ_CONFIG_VIEW = MappingProxyType(GROQ_MODEL_CONFIG)
+
+# Prompts rápidos: configuración "quick" (modelo ligero) con max_tokens ajustado
+# al tamaño de su respuesta JSON, para no reservar tokens que nunca se generan
+_QUICK_PROMPT_MAX_TOKENS = {
+    "quick_classification": 48,
+    "quick_validation": 64
+}
+_QUICK_PROMPT_TYPES = frozenset(_QUICK_PROMPT_MAX_TOKENS)
+_PROMPT_TYPE_GROQ_CONFIGS = {
+    prompt_type: {**_MERGED_GROQ_CONFIGS["quick"], "max_tokens": max_tokens}
+    for prompt_type, max_tokens in _QUICK_PROMPT_MAX_TOKENS.items()
+}
+_PROMPT_TYPE_GROQ_CONFIG_VIEWS = {
+    prompt_type: MappingProxyType(config)
+    for prompt_type, config in _PROMPT_TYPE_GROQ_CONFIGS.items()
+}
+
+def get_groq_config(analysis_type: str = "detailed", prompt_type: Optional[str] = None) -> dict:
+    """Obtiene la configuración optimizada para Groq (copia modificable)."""
+    if prompt_type in _PROMPT_TYPE_GROQ_CONFIGS:
+        return _PROMPT_TYPE_GROQ_CONFIGS[prompt_type].copy()
+    return _MERGED_GROQ_CONFIGS.get(analysis_type, GROQ_MODEL_CONFIG).copy()
+
+def get_groq_config_view(analysis_type: str = "detailed",
+                         prompt_type: Optional[str] = None) -> MappingProxyType:
+    """Obtiene la configuración optimizada para Groq como vista de solo lectura (sin copia)."""
+    if prompt_type in _PROMPT_TYPE_GROQ_CONFIG_VIEWS:
+        return _PROMPT_TYPE_GROQ_CONFIG_VIEWS[prompt_type]
+    return _GROQ_CONFIG_VIEWS.get(analysis_type, _DEFAULT_GROQ_CONFIG_VIEW)
 
 # =============================================================================
 # PROMPTS ESPECÍFICOS POR FASE
 # =============================================================================
 
 # Fase 1: Análisis de documentos
-GROQ_PHASE1_DOCUMENT_ANALYSIS = f"""{GROQ_BASE_PROMPT}
-{{
-  "document_structure": {{
+GROQ_PHASE1_DOCUMENT_ANALYSIS = GROQ_BASE_PROMPT + """
+{
+  "document_structure": {
     "sections": "array",
     "completeness": "object",
     "quality": "number"
-  }},
-  "extracted_data": {{
+  },
+  "extracted_data": {
     "general_info": "object",
     "technical_specs": "object",
     "calculations": "object"
-  }},
+  },
   "next_steps": "array"
-}}
+}
 
-DOCUMENTO: {{document_text}}"""
+DOCUMENTO: {document_text}"""
 
 # Fase 2: Análisis de planos
-GROQ_PHASE2_PLAN_ANALYSIS = f"""{GROQ_BASE_PROMPT}
-{{
-  "plan_elements": {{
+GROQ_PHASE2_PLAN_ANALYSIS = GROQ_BASE_PROMPT + """
+{
+  "plan_elements": {
     "walls": "array",
     "doors": "array",
     "windows": "array",
     "rooms": "array"
-  }},
-  "measurements": {{
+  },
+  "measurements": {
     "areas": "array",
     "distances": "array",
     "dimensions": "array"
-  }},
+  },
   "compliance_issues": "array"
-}}
+}
 
-PLANOS: {{plan_data}}"""
+PLANOS: {plan_data}"""
 
 # Fase 3: Integración
-GROQ_PHASE3_INTEGRATION = f"""{GROQ_BASE_PROMPT}
-{{
-  "integration_analysis": {{
+GROQ_PHASE3_INTEGRATION = GROQ_BASE_PROMPT + """
+{
+  "integration_analysis": {
     "consistency": "object",
     "completeness": "object",
     "accuracy": "object"
-  }},
-  "correlation_results": {{
+  },
+  "correlation_results": {
     "memory_plan_match": "boolean",
     "calculation_accuracy": "number",
     "specification_completeness": "number"
-  }},
+  },
   "recommendations": "array"
-}}
+}
 
-MEMORIA: {{memory_data}}
-PLANOS: {{plan_data}}"""
+MEMORIA: {memory_data}
+PLANOS: {plan_data}"""
 
 # Fase 4: Sistema conversacional
-GROQ_PHASE4_CONVERSATION = f"""{GROQ_BASE_PROMPT}
-{{
-  "response": {{
+GROQ_PHASE4_CONVERSATION = GROQ_BASE_PROMPT + """
+{
+  "response": {
     "type": "string",
     "content": "string",
     "confidence": "number",
     "next_questions": "array"
-  }},
-  "context_update": {{
+  },
+  "context_update": {
     "new_information": "object",
     "resolved_ambiguities": "array"
-  }}
-}}
+  }
+}
 
-CONTEXTO: {{conversation_context}}
-PREGUNTA: {{user_question}}"""
+CONTEXTO: {conversation_context}
+PREGUNTA: {user_question}"""
 
 # Fase 5: Optimización
-GROQ_PHASE5_OPTIMIZATION = f"""{GROQ_BASE_PROMPT}
-{{
-  "optimization_analysis": {{
+GROQ_PHASE5_OPTIMIZATION = GROQ_BASE_PROMPT + """
+{
+  "optimization_analysis": {
     "performance_metrics": "object",
     "bottlenecks": "array",
     "improvements": "array"
-  }},
-  "production_readiness": {{
+  },
+  "production_readiness": {
     "score": "number",
     "issues": "array",
     "recommendations": "array"
-  }}
-}}
+  }
+}
 
-SISTEMA: {{system_data}}"""
+SISTEMA: {system_data}"""
@@ -3,11 +3,22 @@ Integrated Verification System that combines all analysis methods.
 Integrates OCR, AI, Computer Vision, and NLP for comprehensive building verification.
 """
 
+import io
+import os
+import asyncio
 import logging
 import json
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
+import fitz  # PyMuPDF
+import numpy as np
+
 from .production_project_analyzer import ProductionProjectAnalyzer
 from .advanced_plan_analyzer import AdvancedPlanAnalyzer
 from .enhanced_ocr_processor import EnhancedOCRProcessor
@@ -16,6 +27,118 @@ from ..models.schemas import Issue, Question, ProjectData, SeverityLevel
 
 logger = logging.getLogger(__name__)
 
+# Pages whose text layer has at least this many characters are born-digital and skip OCR
+MIN_TEXT_LAYER_CHARS = 50
+# Render zoom for pages that do need OCR
+OCR_RENDER_ZOOM = 2.0
+# OCR dimensions compared against all plan dimensions per cross-validation step
+CROSS_VALIDATION_BLOCK_ROWS = 256
+
+# Dimension with an optional label ("ancho: 3,5 m"); longer units come first so "mm"/"cm" are not read as "m"
+_DIMENSION_RE = re.compile(
+    r'(?:(?:ancho|anchura|alto|altura|largo|longitud)[\s:]+)?'
+    r'(\d+(?:[.,]\d+)?)\s*(mm|milímetros?|cm|centímetros?|metros?|m)',
+    re.IGNORECASE
+)
+# Scale to meters keyed by the first two letters of the matched unit
+_UNIT_TO_METERS = {'mm': 0.001, 'mi': 0.001, 'cm': 0.01, 'ce': 0.01}
+
+# Keywords that mark a PDF as a plan, by filename ("planos" and "plantas" are covered by the stems)
+_PLAN_FILENAME_RE = re.compile(r'plano|planta', re.IGNORECASE)
+# ... or by the text of any of its pages
+_PLAN_TEXT_RE = re.compile(r'planta|plano|escala|nivel', re.IGNORECASE)
+
+def _extract_pdf_text(ocr_processor: EnhancedOCRProcessor, pdf_file: str) -> Dict[str, Any]:
+    """
+    Extract the text of a PDF page by page.
+    
+    The embedded text layer is used when the page has one; only scanned pages
+    (little or no extractable text) are rendered and sent to Tesseract.
+    """
+    try:
+        pages = []
+        ocr_pages = 0
+        
+        with fitz.open(pdf_file) as doc:
+            for page_index, page in enumerate(doc):
+                text = page.get_text()
+                if len(text.strip()) >= MIN_TEXT_LAYER_CHARS:
+                    pages.append({
+                        'page_number': page_index + 1,
+                        'text': text,
+                        'confidence': 1.0,
+                        'method': 'text_layer'
+                    })
+                    continue
+                
+                # Scanned page: render in grayscale and run OCR on it
+                pix = page.get_pixmap(matrix=fitz.Matrix(OCR_RENDER_ZOOM, OCR_RENDER_ZOOM),
+                                      colorspace=fitz.csGRAY, alpha=False)
+                image = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+                ocr_result = ocr_processor.extract_text_from_image(image)
+                pages.append({
+                    'page_number': page_index + 1,
+                    'text': ocr_result.text,
+                    'confidence': float(ocr_result.confidence) / 100,  # Tesseract reports 0-100
+                    'method': 'ocr'
+                })
+                ocr_pages += 1
+        
+        return {
+            'success': True,
+            'pages': pages,
+            'page_count': len(pages),
+            'ocr_pages': ocr_pages,
+            'errors': []
+        }
+        
+    except Exception as e:
+        return {'success': False, 'pages': [], 'page_count': 0, 'errors': [str(e)]}
+
+# OCR processor of each worker process (created on first use, rebuilt if the config changes)
+_worker_ocr_processor: Optional[EnhancedOCRProcessor] = None
+
+def _ocr_one(pdf_file: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Extract the text of a single PDF inside a worker process."""
+    global _worker_ocr_processor
+    if _worker_ocr_processor is None or _worker_ocr_processor.config != config:
+        _worker_ocr_processor = EnhancedOCRProcessor(config)
+    return _extract_pdf_text(_worker_ocr_processor, pdf_file)
+
+# Process pool shared by all requests, sized once to the CPU count
+_ocr_pool: Optional[ProcessPoolExecutor] = None
+_ocr_pool_lock = threading.Lock()
+
+def _get_ocr_pool() -> ProcessPoolExecutor:
+    """Return the shared OCR pool, creating it on first use."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # forkserver: never fork the multi-threaded server process itself
+            max_workers = os.cpu_count() or 1
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+            logger.info(f"OCR process pool started with {max_workers} workers")
+        return _ocr_pool
+
+def _discard_ocr_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next request starts a new one."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_ocr_pool():
+    """Shut down the shared OCR pool (on application shutdown)."""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        pool, _ocr_pool = _ocr_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
 class IntegratedVerificationSystem:
     """
     Integrated verification system that combines all analysis methods.
@@ -30,7 +153,7 @@ class IntegratedVerificationSystem:
         
         logger.info("Integrated Verification System initialized")
     
-    def verify_project_comprehensive(
+    async def verify_project_comprehensive(
         self, 
         pdf_files: List[str],
         is_existing_building: bool = False
@@ -49,21 +172,28 @@ class IntegratedVerificationSystem:
             logger.info(f"Starting comprehensive verification of {len(pdf_files)} files")
             
             # Phase 1: OCR Processing
-            ocr_results = self._process_all_pdfs(pdf_files)
-            
-            # Phase 2: Plan Analysis (if plan files detected)
-            plan_analysis = self._analyze_plans(pdf_files, ocr_results)
-            
-            # Phase 3: Project Data Extraction
-            project_data = self._extract_project_data(ocr_results)
+            ocr_results = await asyncio.to_thread(self._process_all_pdfs, pdf_files)
+            
+            # Phases 2-3 and the Annexe I check only depend on the OCR results, so plan
+            # analysis (CV), project data extraction (AI) and Annexe I run concurrently
+            plan_analysis, project_data, annexe_i_result = await asyncio.gather(
+                # Phase 2: Plan Analysis (if plan files detected)
+                asyncio.to_thread(self._analyze_plans, pdf_files, ocr_results),
+                # Phase 3: Project Data Extraction
+                asyncio.to_thread(self._extract_project_data, ocr_results),
+                asyncio.to_thread(self.project_analyzer.check_annexe_i_compliance, ocr_results),
+                return_exceptions=True
+            )
             
             # Phase 4: Normative Compliance Check
-            compliance_results = self._check_normative_compliance(
-                project_data, ocr_results, plan_analysis, is_existing_building
+            compliance_results = await asyncio.to_thread(
+                self._check_normative_compliance,
+                project_data, ocr_results, plan_analysis, is_existing_building, annexe_i_result
             )
             
             # Phase 5: Cross-validation and Integration
-            integrated_results = self._integrate_all_results(
+            integrated_results = await asyncio.to_thread(
+                self._integrate_all_results,
                 ocr_results, plan_analysis, project_data, compliance_results
             )
             
@@ -102,12 +232,30 @@ class IntegratedVerificationSystem:
         try:
             ocr_results = {}
             
-            for pdf_file in pdf_files:
-                logger.info(f"Processing PDF: {pdf_file}")
-                
-                # Extract text from PDF
-                result = self.ocr_processor.extract_text_from_pdf(pdf_file)
+            if len(pdf_files) <= 1:
+                results = []
+                for pdf_file in pdf_files:
+                    logger.info(f"Processing PDF: {pdf_file}")
+                    results.append(_extract_pdf_text(self.ocr_processor, pdf_file))
+            else:
+                # OCR is CPU-bound: spread the files over the shared worker processes
+                pool = _get_ocr_pool()
+                config = self.ocr_processor.config
+                futures = [pool.submit(_ocr_one, pdf_file, config) for pdf_file in pdf_files]
+                logger.info(f"Processing {len(pdf_files)} PDFs in the OCR process pool")
                 
+                # Results are collected in input order so the combined text stays stable
+                results = []
+                for pdf_file, future in zip(pdf_files, futures):
+                    try:
+                        results.append(future.result())
+                    except BrokenProcessPool as e:
+                        _discard_ocr_pool(pool)
+                        results.append({'success': False, 'errors': [str(e)]})
+                    except Exception as e:
+                        results.append({'success': False, 'errors': [str(e)]})
+            
+            for pdf_file, result in zip(pdf_files, results):
                 if result['success']:
                     ocr_results[Path(pdf_file).name] = result
                 else:
@@ -126,19 +274,15 @@ class IntegratedVerificationSystem:
             
             # Identify plan files based on filename and content
             for pdf_file in pdf_files:
-                filename = Path(pdf_file).name.lower()
-                if any(keyword in filename for keyword in ['plano', 'planos', 'planta', 'plantas']):
+                filename = Path(pdf_file).name
+                if _PLAN_FILENAME_RE.search(filename):
+                    plan_files.append(pdf_file)
+                    continue
+                
+                # Check content for plan indicators
+                pages = ocr_results.get(filename, {}).get('pages', [])
+                if any(_PLAN_TEXT_RE.search(page.get('text', '')) for page in pages):
                     plan_files.append(pdf_file)
-                else:
-                    # Check content for plan indicators
-                    file_data = ocr_results.get(Path(pdf_file).name, {})
-                    pages = file_data.get('pages', [])
-                    
-                    for page in pages:
-                        text = page.get('text', '').lower()
-                        if any(keyword in text for keyword in ['planta', 'plano', 'escala', 'nivel']):
-                            plan_files.append(pdf_file)
-                            break
             
             if not plan_files:
                 logger.info("No plan files detected")
@@ -183,9 +327,15 @@ class IntegratedVerificationSystem:
         project_data: Optional[ProjectData], 
         ocr_results: Dict[str, Any], 
         plan_analysis: Dict[str, Any],
-        is_existing_building: bool
+        is_existing_building: bool,
+        annexe_i_result: Any = None
     ) -> Dict[str, Any]:
-        """Check normative compliance using all available data."""
+        """
+        Check normative compliance using all available data.
+        
+        annexe_i_result is the Annexe I check already run concurrently with the
+        other phases (or the exception it raised); it is computed here if omitted.
+        """
         try:
             compliance_results = {
                 'annexe_i_compliance': {},
@@ -200,8 +350,11 @@ class IntegratedVerificationSystem:
             }
             
             # Check Annexe I compliance
-            anexe_i_result = self.project_analyzer.check_annexe_i_compliance(ocr_results)
-            compliance_results['annexe_i_compliance'] = anexe_i_result
+            if annexe_i_result is None:
+                annexe_i_result = self.project_analyzer.check_annexe_i_compliance(ocr_results)
+            elif isinstance(annexe_i_result, Exception):
+                raise annexe_i_result
+            compliance_results['annexe_i_compliance'] = annexe_i_result
             
             # Check complete compliance
             if project_data:
@@ -329,20 +482,46 @@ class IntegratedVerificationSystem:
             # Extract dimensions from plan analysis
             plan_dimensions = self._extract_plan_dimensions(plan_analysis)
             
-            # Compare dimensions
-            for ocr_dim in ocr_dimensions:
-                for plan_dim in plan_dimensions:
-                    if self._are_dimensions_comparable(ocr_dim, plan_dim):
-                        difference = abs(ocr_dim['value'] - plan_dim['value'])
-                        if difference > 0.1:  # 10cm tolerance
-                            issues.append({
-                                'type': 'dimension_mismatch',
-                                'description': f'Discrepancia dimensional: OCR {ocr_dim["value"]:.2f}m vs Planos {plan_dim["value"]:.2f}m',
-                                'severity': 'medium',
-                                'ocr_value': ocr_dim['value'],
-                                'plan_value': plan_dim['value'],
-                                'difference': difference
-                            })
+            if not ocr_dimensions or not plan_dimensions:
+                return issues
+            
+            # Units compared as small integer codes (no object arrays)
+            unit_codes: Dict[Any, int] = {}
+            ocr_values = np.fromiter((dim['value'] for dim in ocr_dimensions), dtype=np.float64,
+                                     count=len(ocr_dimensions))
+            ocr_units = np.fromiter((unit_codes.setdefault(dim.get('unit'), len(unit_codes))
+                                     for dim in ocr_dimensions), dtype=np.int32, count=len(ocr_dimensions))
+            plan_values = np.fromiter((dim['value'] for dim in plan_dimensions), dtype=np.float64,
+                                      count=len(plan_dimensions))[None, :]
+            plan_units = np.fromiter((unit_codes.setdefault(dim.get('unit'), len(unit_codes))
+                                      for dim in plan_dimensions), dtype=np.int32,
+                                      count=len(plan_dimensions))[None, :]
+            
+            # Compare OCR rows in fixed-size blocks so the temporaries stay at
+            # CROSS_VALIDATION_BLOCK_ROWS x len(plan_dimensions) whatever the OCR count
+            for start in range(0, len(ocr_dimensions), CROSS_VALIDATION_BLOCK_ROWS):
+                block_values = ocr_values[start:start + CROSS_VALIDATION_BLOCK_ROWS, None]
+                block_units = ocr_units[start:start + CROSS_VALIDATION_BLOCK_ROWS, None]
+                
+                differences = np.abs(block_values - plan_values)
+                max_values = np.maximum(block_values, plan_values)
+                ratios = np.divide(differences, max_values,
+                                   out=np.full(differences.shape, np.inf), where=max_values != 0)
+                
+                # Comparable (same unit, within 50% of each other) but beyond the 10cm tolerance
+                mismatches = (block_units == plan_units) & (ratios < 0.5) & (differences > 0.1)
+                
+                for ocr_index, plan_index in np.argwhere(mismatches):
+                    ocr_dim = ocr_dimensions[start + ocr_index]
+                    plan_dim = plan_dimensions[plan_index]
+                    issues.append({
+                        'type': 'dimension_mismatch',
+                        'description': f'Discrepancia dimensional: OCR {ocr_dim["value"]:.2f}m vs Planos {plan_dim["value"]:.2f}m',
+                        'severity': 'medium',
+                        'ocr_value': ocr_dim['value'],
+                        'plan_value': plan_dim['value'],
+                        'difference': abs(ocr_dim['value'] - plan_dim['value'])
+                    })
             
             return issues
             
@@ -359,24 +538,18 @@ class IntegratedVerificationSystem:
                 pages = file_data.get('pages', [])
                 for page in pages:
                     text = page.get('text', '')
+                    if not text:
+                        continue
                     
-                    # Extract dimensions using regex
-                    import re
-                    patterns = [
-                        r'(\d+(?:[.,]\d+)?)\s*(?:m|metros?|mm|milímetros?|cm|centímetros?)',
-                        r'(?:ancho|anchura|alto|altura|largo|longitud)[\s:]+(\d+(?:[.,]\d+)?)\s*(?:m|metros?|mm|milímetros?|cm|centímetros?)'
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.finditer(pattern, text, re.IGNORECASE)
-                        for match in matches:
-                            value = float(match.group(1).replace(',', '.'))
-                            dimensions.append({
-                                'value': value,
-                                'unit': 'm',
-                                'source': 'ocr',
-                                'text': match.group()
-                            })
+                    for match in _DIMENSION_RE.finditer(text):
+                        unit = match.group(2).lower()
+                        value = float(match.group(1).replace(',', '.')) * _UNIT_TO_METERS.get(unit[:2], 1.0)
+                        dimensions.append({
+                            'value': value,
+                            'unit': 'm',
+                            'source': 'ocr',
+                            'text': match.group()
+                        })
             
             return dimensions
             
@@ -411,20 +584,6 @@ class IntegratedVerificationSystem:
             logger.error(f"Error extracting plan dimensions: {e}")
             return []
     
-    def _are_dimensions_comparable(self, dim1: Dict[str, Any], dim2: Dict[str, Any]) -> bool:
-        """Check if two dimensions are comparable."""
-        try:
-            # Same unit
-            if dim1.get('unit') != dim2.get('unit'):
-                return False
-            
-            # Similar value range
-            ratio = abs(dim1['value'] - dim2['value']) / max(dim1['value'], dim2['value'])
-            return ratio < 0.5  # Within 50% difference
-            
-        except Exception:
-            return False
-    
     def _calculate_integrated_confidence(
         self, 
         ocr_results: Dict[str, Any], 
@@ -597,20 +756,28 @@ class IntegratedVerificationSystem:
     
     def _combine_all_texts(self, ocr_results: Dict[str, Any]) -> str:
         """Combine all text from OCR results."""
-        text_parts = []
+        # Pages are streamed into one buffer instead of a list of formatted copies
+        buffer = io.StringIO()
+        separator = ''
         
         for filename, file_data in ocr_results.items():
-            if file_data.get('success'):
-                pages = file_data.get('pages', [])
-                for page in pages:
-                    page_text = page.get('text', '')
-                    page_number = page.get('page_number', 0)
-                    confidence = page.get('confidence', 0.0)
-                    
-                    if page_text and confidence > 0.3:
-                        text_parts.append(f"--- {filename} - Página {page_number} ---\n{page_text}")
+            if not file_data.get('success'):
+                continue
+            for page in file_data.get('pages', []):
+                page_text = page.get('text', '')
+                if not page_text or page.get('confidence', 0.0) <= 0.3:
+                    continue
+                
+                buffer.write(separator)
+                buffer.write('--- ')
+                buffer.write(filename)
+                buffer.write(' - Página ')
+                buffer.write(str(page.get('page_number', 0)))
+                buffer.write(' ---\n')
+                buffer.write(page_text)
+                separator = '\n\n'
         
-        return '\n\n'.join(text_parts)
+        return buffer.getvalue()
     
     def export_verification_results(self, results: Dict[str, Any], output_path: str) -> bool:
         """Export verification results to JSON file."""
@@ -13,6 +13,9 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de bloque para el cálculo de hashes (1 MiB)
+HASH_CHUNK_SIZE = 1 << 20
+
 @dataclass
 class NormativeDocument:
     """Documento normativo procesado."""
@@ -160,12 +163,12 @@ class MadridNormativeProcessor:
         return building_type_mapping.get(filename_lower)
     
     def _calculate_checksum(self, file_path: Path) -> str:
-        """Calcular checksum del archivo."""
-        hash_md5 = hashlib.md5()
+        """Calcular checksum del archivo (SHA-256 truncado a 128 bits, 32 caracteres hex)."""
+        hash_sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.digest()[:16].hex()
     
     def get_applicable_documents(self, project_data: Dict[str, Any]) -> List[NormativeDocument]:
         """
@@ -14,6 +14,9 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de bloque para el cálculo de hashes (1 MiB)
+HASH_CHUNK_SIZE = 1 << 20
+
 @dataclass
 class PDFPage:
     """Información de una página PDF."""
@@ -55,12 +58,13 @@ class PDFProcessor:
         
         logger.info("PDFProcessor initialized")
     
-    def process_pdf(self, file_path: str) -> PDFDocument:
+    def process_pdf(self, file_path: str, file_hash: Optional[str] = None) -> PDFDocument:
         """
         Procesar un archivo PDF completo.
         
         Args:
             file_path: Ruta del archivo PDF
+            file_hash: Hash SHA-256 ya calculado (evita releer el archivo)
             
         Returns:
             Documento PDF procesado
@@ -78,8 +82,9 @@ class PDFProcessor:
             if file_size > self.max_file_size:
                 raise ValueError(f"Archivo demasiado grande: {file_size} bytes")
             
-            # Calcular hash del archivo
-            file_hash = self._calculate_file_hash(file_path)
+            # Calcular hash del archivo (si no se conoce ya)
+            if file_hash is None:
+                file_hash = self._calculate_file_hash(file_path)
             
             # Abrir documento PDF
             doc = fitz.open(file_path)
@@ -206,12 +211,12 @@ class PDFProcessor:
             return []
     
     def _calculate_file_hash(self, file_path: str) -> str:
-        """Calcular hash MD5 de un archivo."""
-        hash_md5 = hashlib.md5()
+        """Calcular hash SHA-256 de un archivo (mismo algoritmo que FileManager)."""
+        hash_sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                hash_sha256.update(chunk)
+        return hash_sha256.hexdigest()
     
     def extract_text_only(self, file_path: str) -> str:
         """
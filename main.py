@@ -26,6 +26,8 @@ sys.path.insert(0, str(project_root))
 from backend.app.core.config import get_config
 from backend.app.core.logging_config import get_logger, initialize_logging
 from backend.app.core.file_manager import FileManager
+from backend.app.core.groq_client import GroqClient
+from backend.app.core.integrated_verification_system import shutdown_ocr_pool
 from backend.app.core.production_project_analyzer import ProductionProjectAnalyzer
 from backend.app.core.enhanced_project_analyzer_v2 import EnhancedProjectAnalyzerV2
 from backend.app.core.enhanced_project_analyzer_v3 import EnhancedProjectAnalyzerV3
@@ -134,6 +136,12 @@ async def shutdown_event():
     """Cleanup on shutdown."""
     await state_manager.close()
     
+    # Cerrar la sesión HTTP compartida del cliente Groq
+    await GroqClient.close_shared_session()
+    
+    # Detener el pool de procesos OCR compartido
+    shutdown_ocr_pool()
+    
     # Detener programador de limpieza de Neo4j
     cleanup_scheduler.stop_scheduler()
 
@@ -687,7 +695,7 @@ async def verify_phase3(
         })
         
         # Run comprehensive analysis with Phase 3
-        result = enhanced_analyzer_v4.analyze_project_comprehensive(
+        result = await enhanced_analyzer_v4.analyze_project_comprehensive(
             memory_file=memory_path,
             plans_directory=plans_directory,
             project_type=project_type
@@ -15,7 +15,7 @@ from pathlib import Path
 # Añadir el directorio del proyecto al path
 sys.path.append(str(Path(__file__).parent))
 
-from backend.app.core.groq_optimized_prompts import get_groq_config, get_optimized_prompt
+from backend.app.core.groq_optimized_prompts import get_groq_config_view, get_optimized_prompt
 from backend.app.core.opencv_optimizer import create_optimized_config, benchmark_detection
 from backend.app.core.neo4j_optimizer import optimize_neo4j_for_free_tier, get_neo4j_usage_report
 
@@ -50,7 +50,7 @@ class GroqSystemOptimizer:
             best_score = 0
             
             for config_type in configs:
-                config = get_groq_config(config_type)
+                config = get_groq_config_view(config_type)
                 
                 # Simular prueba de prompt
                 test_prompt = get_optimized_prompt(